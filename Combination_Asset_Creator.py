@@ -1,16 +1,23 @@
 #-------------------------------------------------------------------------------
 # Name:         Combination_Asset_Creator.py (main script)
 # Purpose:      Creates Combination Assets
+#               With [tenable.sc:<name>] sections in 'config.conf', runs on every
+#               console in parallel (see 'pyConsoles.py')
 # Author:       Morteza Zeinali               
 #
 # Import standard library modules
 import os
+import sys
 import time
-from configparser import ConfigParser
 
 # Import third-party modules
 import requests
 import pyTenableAPI
+from pyLogger import Logger, logging_options
+from pyMetrics import export_metrics, textfile_path
+from pyProfiler import Profiler, profiling_requested
+from pyRecords import AssetIndex
+from pyConsoles import console_config, console_names, console_scriptname, fan_out, read_config, selected_console
 
 # ===================================================================
 # --- Global call to the configuration file
@@ -18,68 +25,100 @@ import pyTenableAPI
 
 # Path to configuration file
 configfile = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.conf')
-config = ConfigParser(delimiters=('=', ','))
+config = console_config(read_config(configfile), selected_console())
+
+# Logging, phase timers, and cProfile/tracemalloc output with '--profile'
+scriptloc = os.path.join(os.path.dirname(os.path.realpath(__file__)), '')
+scriptname = console_scriptname(os.path.splitext(os.path.basename(__file__))[0])
+log_instance = Logger(scriptloc, scriptname)
+logger = log_instance.setup(**logging_options(config))
+profiler = Profiler(logger, scriptloc + scriptname)
 
 # ===================================================================
 # --- Create | Update combination assets in Tenable.sc
 # ===================================================================
 
 def update_comb_assets(comb_asset_list, comb_asset_Name, sc):
+    # One snapshot of Tenable.sc assets serves every lookup below
+    with profiler.phase('asset snapshot'):
+        asset_index = AssetIndex(sc.GetAssets())
+
     # Matching asset names with asset Ids in Tenable.sc
-    asset_ids = [asset['id'] for asset in sc.HTTPRequest('GET', 'asset').json()['response']['usable']
-                 if asset['name'] in comb_asset_list]
+    asset_ids = [asset.id for asset in asset_index if asset.name in comb_asset_list]
+    if len(asset_ids) < 2:
+        logger.error(f'A combination asset needs at least 2 of the assets {", ".join(comb_asset_list)}; '
+                     f'found {len(asset_ids)} in Tenable.sc')
+        sys.exit(1)
 
     # A dict template for 2 asset
-    comb = {"operator": "union", "operand1": {"id": asset_ids[0]}, "operand2": {"id": asset_ids[1]}}
+    combination_assets = {"operator": "union", "operand1": {"id": asset_ids[0]}, "operand2": {"id": asset_ids[1]}}
 
-    # Call to create combination asset having two assets
-    if len(asset_ids) == 2:
-        combination_assets = comb
-    elif len(asset_ids) > 2:
-        combination_assets = {"operator": "union", "operand1": comb, "operand2": {"id": asset_ids[2]}}
-        combination_assets = {"operator": "union", "operand1": combination_assets, "operand2": {"id": item}
-                              for item in asset_ids[3:]}
+    # Nest a further union for every additional asset
+    for item in asset_ids[2:]:
+        combination_assets = {"operator": "union", "operand1": combination_assets, "operand2": {"id": item}}
 
     # Create combination asset if it does not already exist in Tenable.sc
-    if comb_asset_Name not in [a['name'] for a in sc.HTTPRequest('GET', 'asset').json()['response']['usable']]:
-        time.sleep(2)
-        sc.HTTPRequest('POST', 'asset', data={"tags": "BA Group", "name": comb_asset_Name, "groups": [],
-                                               "type": "combination", "combinations": combination_assets})
+    existing = asset_index.find(comb_asset_Name)
+    if not existing:
+        time.sleep(config.getfloat('tenable.sc', 'write_delay', fallback=2))
+        with profiler.phase('writes'):
+            sc.HTTPRequest('POST', 'asset', data={"tags": "BA Group", "name": comb_asset_Name, "groups": [],
+                                                   "type": "combination", "combinations": combination_assets})
         print(f'{comb_asset_Name} has been created')
     else:
-        for dict_item in sc.HTTPRequest('GET', 'asset').json()['response']['usable']:
-            if comb_asset_Name == dict_item["name"]:
-                print('\nThe asset already exists, updating combination asset...')
-                time.sleep(2)
-                sc.HTTPRequest('PATCH', f'asset/{dict_item["id"]}', data={"combinations": combination_assets})
-                print('\nThe combination asset has been updated!')
+        for asset in existing:
+            print('\nThe asset already exists, updating combination asset...')
+            time.sleep(config.getfloat('tenable.sc', 'write_delay', fallback=2))
+            with profiler.phase('writes'):
+                sc.HTTPRequest('PATCH', f'asset/{asset.id}', data={"combinations": combination_assets})
+            print('\nThe combination asset has been updated!')
 
 # --------------------------------------------------------------------------------
 # --- MAIN body of the script. This is where the pieces come together
 # --------------------------------------------------------------------------------
 
-def main():
-    # Get credential data from "config.conf" file
-    sc_host = config.get('tenable.sc', 'sc_host')
-    sc_username = config.get('tenable.sc', 'sc_username')
-    sc_password = config.get('tenable.sc', 'sc_password')
-
-    # Connect to Tenable.sc
-    try:
-        sc = pyTenableAPI.TenablescAPI(url=sc_host, username=sc_username, password=sc_password)
-        sc.LoginTenable()
-        print("Logged in successfully to Tenable.sc!")
-    except pyTenableAPI.TenableAPIError as e:
-        print(f'Failed to connect to Tenable.sc server: {e}')
-        sys.exit(1)
-
+def run_combination(sc):
     # A sample combination asset input includes "comb_asset_list" and combination asset name here named: "Combination Asset"
     comb_asset_Name = "Combination Asset"
     comb_asset_list = ['740', '741', '742', '743']
 
     update_comb_assets(comb_asset_list, comb_asset_Name, sc)
 
-    
-    
-    
-    
+
+def main():
+    profiler.start(profiling_requested(config))
+    sc = None
+    try:
+        # With [tenable.sc:<name>] sections, run once per console in parallel
+        consoles = console_names(config)
+        if consoles and not selected_console():
+            sys.exit(fan_out(logger, __file__, consoles, sys.argv[1:]))
+
+        # Get credential data from "config.conf" file
+        sc_host = config.get('tenable.sc', 'sc_host')
+        sc_username = config.get('tenable.sc', 'sc_username')
+        sc_password = config.get('tenable.sc', 'sc_password')
+
+        # Connect to Tenable.sc
+        try:
+            sc_cache_ttl = config.getfloat('tenable.sc', 'cache_ttl', fallback=0)
+            sc_rate_limit = config.getfloat('tenable.sc', 'rate_limit', fallback=0)
+            sc = pyTenableAPI.TenablescAPI(url=sc_host, username=sc_username, password=sc_password,
+                                           cache_ttl=sc_cache_ttl, rate_limit=sc_rate_limit,
+                                           instance=selected_console())
+            with profiler.phase('login'):
+                sc.LoginTenable()
+            print("Logged in successfully to Tenable.sc!")
+        except Exception as e:
+            print(f'Failed to connect to Tenable.sc server: {e}')
+            sys.exit(1)
+
+        run_combination(sc)
+    finally:
+        # Also when an API error exits through sys.exit() in HTTPRequest
+        export_metrics(logger, [sc and sc.metrics], textfile_path(config, scriptname))
+        profiler.stop()
+        log_instance.closeHandlers()
+
+if __name__ == '__main__':
+    main()
@@ -15,6 +15,23 @@
             3. Create a path as 'config.conf' file if not exists.
             4. All errors occurring during the API calls or unexpected values would be logged
                with the same name of scripts + .log
+            5. Record handled assets in 'ReportCreator.journal' so a failed run resumes
+               with the remaining assets only, if it started within 'resume_max_hours'
+               in [Reports].
+            6. Time each phase (login, asset list, vuln export, rollups, analysis, writes);
+               run with '--profile' to also write cProfile/tracemalloc output next to the log.
+            7. With [tenable.sc:<name>] sections in 'config.conf', create the reports on
+               every console in parallel; see 'pyConsoles.py'.
+            8. With 'path' set in [VulnStore], export the findings of the report assets
+               into a local SQLite store (incrementally by lastSeen, pages fetched in
+               parallel) and decide on reports from it; see 'pyVulnStore.py'. With NumPy
+               installed, also summarise the findings per asset and service for the
+               report emails; see 'pyAnalytics.py'.
+            9. With 'track_timeout' set in [Reports], launch every created report, poll
+               all running reports with one listing request (backing off while none
+               finish) and download and email each one as soon as it completes; see
+               'pyReportJobs.py'. Reports still running at the timeout are left to
+               'ReportDownloader.py'.
     
 
 
@@ -42,16 +59,18 @@ import json
 import time
 import getpass
 import struct
-import requests
 import codecs
 import re
 from socket import inet_aton
-from configparser import ConfigParser
 from datetime import date, datetime, timedelta
-from pyLogger import Logger
-
-# Disable warnings from urllib3
-requests.packages.urllib3.disable_warnings()
+from pyLogger import Logger, SAMPLED, logging_options
+from pyJournal import SyncJournal
+from pyMetrics import export_metrics, textfile_path
+from pyProfiler import Profiler, profiling_requested
+from pyVulnStore import VulnStore, export_vulns, store_path
+import pyAnalytics
+from pyReportJobs import ReportTracker, deliver_report
+from pyConsoles import console_config, console_names, console_scriptname, fan_out, read_config, selected_console
 
 # ===================================================================
 # Global Variables and Configuration
@@ -62,18 +81,44 @@ sys.dont_write_bytecode = True
 
 # Get the script's directory and filename
 scriptloc = os.path.dirname(os.path.realpath(__file__))
-scriptname = os.path.splitext(os.path.basename(__file__))[0]
+scriptname = console_scriptname(os.path.splitext(os.path.basename(__file__))[0])
+
+# Path to configuration file
+configfile = os.path.join(scriptloc, 'config.conf')
 
 # Initialize logging
 loginstance = Logger(scriptloc, scriptname)
-logger = loginstance.setup()
+logger = loginstance.setup(**logging_options(read_config(configfile)))
 
 logger.info(f'Running on Python version {sys.version}')
 
-# Path to configuration file
-configfile = os.path.join(scriptloc, 'config.conf')
-config = ConfigParser(delimiters=('=', ','))
-config.read(configfile)
+# Phase timers, and cProfile/tracemalloc output with '--profile'
+profiler = Profiler(logger, os.path.join(scriptloc, scriptname))
+
+# Read configuration file (parsed once, shared with the logger options)
+config = console_config(read_config(configfile), selected_console())
+
+# Write-ahead journal of handled assets, opened when the script runs
+journal = None
+
+# Tenable.sc client, created when the script runs
+sc = None
+
+# Set once closeexit() has cleaned up, so the main block does not clean up twice
+exiting = False
+
+# Local findings store from [VulnStore], and the assets whose export failed this run
+store = None
+export_failed = set()
+
+# Per-asset rollups of the stored findings (pyAnalytics, needs NumPy), keyed by asset id
+asset_summaries = {}
+
+# Tracker of the launched report runs, when [Reports] track_timeout is set
+tracker = None
+
+# Severity names by Tenable.sc severity id
+SEVERITY_NAMES = ('Info', 'Low', 'Medium', 'High', 'Critical')
 
 # ===================================================================
 # Vulnerability Analysis Function
@@ -83,7 +128,20 @@ def VulnAnalyser(assettid, assetname):
     """
     Analyzes vulnerabilities for the given asset within the last 30 days.
     Returns the highest severity found.
+    Uses the local findings store when enabled, otherwise queries Tenable.sc.
     """
+    if store is not None and str(assettid) not in export_failed:
+        with profiler.phase('analysis'):
+            if asset_summaries:
+                summary = asset_summaries.get(str(assettid))
+                severity = (summary['max_severity'] or 0) if summary else 0
+            else:
+                severity = store.max_severity(assettid, since=int(time.time()) - 30 * 86400)
+        if severity > 0:  # Severity over 0 (Low, Medium, High, Critical)
+            print(f"\nVulnerable asset: {assetname}, Severity: {SEVERITY_NAMES[severity]}")
+            return severity
+        return None
+
     data = {
         "query": {
             "type": "vuln",
@@ -100,13 +158,13 @@ def VulnAnalyser(assettid, assetname):
     }
 
     try:
-        query_result = sc.HTTPRequest('POST', 'analysis', data=data).json()["response"]["results"]
+        with profiler.phase('analysis'):
+            findings = sc.QueryVulns(data, assettid)
 
-        for qry in query_result:
-            severity = int(qry["severity"]["id"])
-            if severity > 0:  # Severity over 0 (Low, Medium, High, Critical)
-                print(f"\nVulnerable asset: {assetname}, Severity: {qry['severity']}")
-                return severity
+        for finding in findings:
+            if finding.severity > 0:  # Severity over 0 (Low, Medium, High, Critical)
+                print(f"\nVulnerable asset: {assetname}, Severity: {finding.severity_name}")
+                return finding.severity
     except Exception as e:
         logger.error(f"Failed to analyze vulnerabilities for {assetname}: {e}")
         return None
@@ -119,16 +177,137 @@ def CreateReport(assettid, assetname):
     """
     Creates a report for the given asset based on its vulnerability analysis.
     """
+    op = f'report:{assettid}'
+    if journal.is_done(op):
+        logger.info(f"Skipping {assetname}, already handled in run {journal.run_id}", extra=SAMPLED)
+        return
+
     try:
         severity = VulnAnalyser(assettid, assetname)
+        journal.planned(op)
         
         if severity:
-            reportdata = {}  # Customize report data as needed
-            sc.HTTPRequest('POST', 'reportDefinition', data=reportdata)
+            reportdata = {'name': assetname}  # Customize report data as needed
+            with profiler.phase('writes'):
+                response = sc.HTTPRequest('POST', 'reportDefinition', data=reportdata)
+                if tracker is not None:
+                    tracker.launch(response.json()['response']['id'], assetname)
+        journal.done(op)
     except Exception as e:
         logger.error(f"Failed to create report for {assetname}: {e}", exc_info=True)
         closeexit(1)
 
+# ===================================================================
+# Report Run
+# ===================================================================
+
+def RunReports(config):
+    """
+    Creates reports for every [CustomReport] asset using the already initialized 'sc' client.
+    """
+    global journal, store, export_failed, asset_summaries, tracker
+    journal = SyncJournal(os.path.join(scriptloc, scriptname + '.journal'),
+                          max_age=config.getfloat('Reports', 'resume_max_hours', fallback=12) * 3600)
+    if journal.resumed:
+        logger.info(f"Resuming interrupted run {journal.run_id}")
+    elif journal.expired:
+        logger.info(f"Not resuming run {journal.expired}: it is older than resume_max_hours")
+
+    # Process assets and generate reports
+    try:
+        report_keys = {key.upper() for key in config.options('CustomReport')}
+        with profiler.phase('asset list'):
+            assets = sc.GetAssets()
+        report_assets = [asset for asset in assets if asset.name.upper() in report_keys]
+
+        # Refresh the local findings store once, then analyse every asset locally
+        path = store_path(config, scriptloc, selected_console())
+        if path:
+            store = VulnStore(path, window_days=config.getint('VulnStore', 'window_days', fallback=30),
+                              full_refresh_days=config.getfloat('VulnStore', 'full_refresh_days', fallback=7))
+            with profiler.phase('vuln export'):
+                exported = export_vulns(sc, store, [asset.id for asset in report_assets],
+                                        page_size=config.getint('VulnStore', 'page_size', fallback=1000),
+                                        max_workers=config.getint('VulnStore', 'max_workers', fallback=4),
+                                        logger=logger)
+            export_failed = set(exported['failed'])
+            RollupFindings(config, report_assets)
+
+        StartTracker(config)
+        for asset in report_assets:
+            CreateReport(asset.id, asset.name)
+
+        if tracker is not None:
+            with profiler.phase('report jobs'):
+                tracked = tracker.wait()
+            logger.info(f"Delivered {tracked['delivered']} reports as they completed "
+                        f"({len(tracked['failed'])} failed, {len(tracked['pending'])} still running)")
+            if tracked['pending']:
+                logger.warning(f"Reports left to ReportDownloader.py: {', '.join(tracked['pending'])}")
+    except Exception as e:
+        logger.error(f"Error during report creation: {e}", exc_info=True)
+        closeexit(1)
+    finally:
+        if tracker is not None:
+            tracker.stop()
+            tracker = None
+        if store is not None:
+            store.close()
+            store = None
+        asset_summaries = {}
+
+    FinishJournal(True)
+
+def StartTracker(config):
+    """
+    Starts tracking the reports launched by CreateReport when 'track_timeout'
+    is set in [Reports], so each one is delivered as soon as it completes.
+    """
+    global tracker
+    timeout = config.getfloat('Reports', 'track_timeout', fallback=0)
+    if timeout <= 0:
+        return
+
+    sharepoint_path = config.get('Reports', 'SharePoint_path')
+    recipients = dict(config.items('Emails')) if config.has_section('Emails') else {}
+    tracker = ReportTracker(sc, logger, timeout=timeout,
+                            poll_interval=config.getfloat('Reports', 'poll_interval', fallback=5),
+                            max_poll_interval=config.getfloat('Reports', 'max_poll_interval', fallback=120))
+    tracker.start(lambda report: deliver_report(sc, report, sharepoint_path, recipients, store))
+
+def RollupFindings(config, report_assets):
+    """
+    Summarises the stored findings per asset (for report gating) and per
+    service (saved in the store for the report emails), over the last
+    'trend_days' in [VulnStore]. Needs NumPy.
+    """
+    global asset_summaries
+    if not pyAnalytics.available():
+        logger.warning("NumPy is not installed; skipping finding rollups and email summaries")
+        return
+
+    now = int(time.time())
+    trend_days = config.getfloat('VulnStore', 'trend_days', fallback=7)
+    with profiler.phase('rollups'):
+        findings = pyAnalytics.load_findings(store, since=now - 30 * 86400)
+        asset_summaries = pyAnalytics.rollup(findings, now, trend_days)
+        service_summaries = pyAnalytics.rollup(findings, now, trend_days,
+                                               names={asset.id: asset.name for asset in report_assets})
+        store.save_summaries(service_summaries, now)
+    logger.info(f"Summarised {len(findings['asset_id'])} findings of {len(asset_summaries)} assets")
+
+def FinishJournal(success):
+    """
+    A finished journal lets the next run start over; otherwise it resumes.
+    """
+    global journal
+    if journal is not None:
+        if success:
+            journal.complete()
+        else:
+            journal.close()
+        journal = None
+
 # ===================================================================
 # Exit Handler
 # ===================================================================
@@ -137,11 +316,18 @@ def closeexit(exit_code):
     """
     Handles exiting the script, closing logs and performing any cleanup.
     """
+    global exiting
+    exiting = True
     if exit_code == 0:
         logger.info('Script completed successfully')
     else:
         logger.error('Script exiting due to an error')
 
+    export_metrics(logger, [sc and sc.metrics], textfile_path(config, scriptname))
+    profiler.stop()
+
+    FinishJournal(exit_code == 0)
+
     loginstance.closeHandlers()
     sys.exit(exit_code)
 
@@ -150,31 +336,41 @@ def closeexit(exit_code):
 # ===================================================================
 
 if __name__ == '__main__':
-    # Get credentials from configuration file
     try:
-        sc_host = config.get('tenable.sc', 'sc_host')
-        sc_username = config.get('tenable.sc', 'sc_username')
-        sc_password = config.get('tenable.sc', 'sc_password')
-
-        # Connect to Tenable.sc
-        import pyTenableAPI
-        sc = pyTenableAPI.TenablescAPI(url=sc_host, username=sc_username, password=sc_password)
-        sc.LoginTenable()
-        logger.info("Logged in successfully to Tenable.sc")
-    except Exception as e:
-        logger.error(f"Failed to connect to Tenable.sc: {e}", exc_info=True)
-        closeexit(1)
-
-    # Process assets and generate reports
-    try:
-        assets = sc.HTTPRequest('GET', 'asset').json()['response']['usable']
-        for asset in assets:
-            for key in config.options('CustomReport'):
-                if key.upper() == asset['name'].upper():
-                    CreateReport(asset['id'], asset['name'])
-    except Exception as e:
-        logger.error(f"Error during report creation: {e}", exc_info=True)
-        closeexit(1)
-
-    # Exit the script cleanly
-    closeexit(0)
+        profiler.start(profiling_requested(config))
+
+        # With [tenable.sc:<name>] sections, run once per console in parallel
+        consoles = console_names(config)
+        if consoles and not selected_console():
+            closeexit(fan_out(logger, __file__, consoles, sys.argv[1:]))
+
+        # Get credentials from configuration file
+        try:
+            sc_host = config.get('tenable.sc', 'sc_host')
+            sc_username = config.get('tenable.sc', 'sc_username')
+            sc_password = config.get('tenable.sc', 'sc_password')
+
+            # Connect to Tenable.sc
+            import pyTenableAPI
+            sc_cache_ttl = config.getfloat('tenable.sc', 'cache_ttl', fallback=0)
+            sc_rate_limit = config.getfloat('tenable.sc', 'rate_limit', fallback=0)
+            sc = pyTenableAPI.TenablescAPI(url=sc_host, username=sc_username, password=sc_password,
+                                           cache_ttl=sc_cache_ttl, rate_limit=sc_rate_limit,
+                                           instance=selected_console())
+            with profiler.phase('login'):
+                sc.LoginTenable()
+            logger.info("Logged in successfully to Tenable.sc")
+        except Exception as e:
+            logger.error(f"Failed to connect to Tenable.sc: {e}", exc_info=True)
+            closeexit(1)
+
+        RunReports(config)
+
+        # Exit the script cleanly
+        closeexit(0)
+    finally:
+        # API errors exit through sys.exit() in HTTPRequest without closeexit(); still export the
+        # metrics, stop the profiler and keep the journal for the next run
+        if not exiting:
+            logger.error(f'Script stopped: {sys.exc_info()[1]}')
+            closeexit(1)
@@ -18,6 +18,14 @@ The following steps will be performed by the script:
             4. Email report names found to the particular recipient pulling from "config.conf" file.
             5. All errors occuring during API calls or unexpected values would be logged
                with the same name of script anme + .log
+            6. Time each phase (login, report list, download, save, email); run with
+               '--profile' to also write cProfile/tracemalloc output next to the log.
+            7. With [tenable.sc:<name>] sections in 'config.conf', download from every
+               console in parallel, each with its own 'last_run'; see 'pyConsoles.py'.
+            8. Add the findings summary saved by 'ReportCreator.py' in the [VulnStore]
+               store to each email, when there is one.
+            9. Skip reports already delivered by the report tracker of 'ReportCreator.py'
+               (their file exists); see 'pyReportJobs.py'.
 
 
 
@@ -47,31 +55,44 @@ The following steps will be performed by the script:
 import os
 import time
 import sys
-from configparser import ConfigParser
 from datetime import datetime
-import requests
-from pyLogger import Logger
+from pyLogger import Logger, SAMPLED, logging_options
 from pyTenableAPI import TenablescAPI
-from email_sender import Email
-
-# Constants for HTTP methods and report status
-GET_METHOD = 'GET'
-POST_METHOD = 'POST'
-COMPLETED_STATUS = 'Completed'
+from pyMetrics import export_metrics, textfile_path
+from pyProfiler import Profiler, profiling_requested
+from pyVulnStore import VulnStore, store_path
+from pyReportJobs import COMPLETED_STATUS, deliver_report
+from pyConsoles import console_config, console_names, console_scriptname, fan_out, read_config, save_state, \
+    selected_console
 
 # Initialize logging
 sys.dont_write_bytecode = True
 script_location = os.path.join(os.path.dirname(os.path.realpath(__file__)), '')
-script_name = os.path.splitext(os.path.basename(__file__))[0]
+script_name = console_scriptname(os.path.splitext(os.path.basename(__file__))[0])
+
+config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.conf')
 
 log_instance = Logger(script_location, script_name)
-logger = log_instance.setup()
+logger = log_instance.setup(**logging_options(read_config(config_file)))
 logger.info(f'Running on Python version {sys.version}')
 
+# Phase timers, and cProfile/tracemalloc output with '--profile'
+profiler = Profiler(logger, script_location + script_name)
+
 # Global configuration setup
-config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.conf')
-config = ConfigParser(delimiters=('=', ','))
-config.read(config_file)
+config = console_config(read_config(config_file), selected_console())
+
+# Tenable.sc client, created when the script runs
+sc = None
+
+# Set once close_exit() has cleaned up, so the main block does not clean up twice
+exiting = False
+
+# Report destination, read from [Reports] on each run
+sharepoint_path = None
+
+# Findings store of ReportCreator.py, for the summaries in the emails
+store = None
 
 def handle_error(message, exit_code=1):
     """Log error messages and exit the script."""
@@ -80,101 +101,101 @@ def handle_error(message, exit_code=1):
 
 def close_exit(exit_code):
     """Exit script cleanly or with an error."""
+    global exiting
+    exiting = True
+    export_metrics(logger, [sc and sc.metrics], textfile_path(config, script_name))
+    profiler.stop()
     log_instance.closeHandlers()
     sys.exit(exit_code)
 
-def create_directory(directory_path):
-    """Create a directory if it doesn't exist."""
-    if not os.path.exists(directory_path):
-        try:
-            os.makedirs(directory_path)
-        except OSError as e:
-            handle_error(f'Failed to create directory: {directory_path}, {e}')
-
-def download_report(sc, report_id):
-    """Download a report from Tenable.sc."""
-    try:
-        return sc.HTTPRequest(POST_METHOD, f'report/{report_id}/download', data={'id': int(report_id)})
-    except Exception as e:
-        handle_error(f'Failed to download report (ID: {report_id}): {e}')
-
 def report_downloader(sharepoint_path, last_run_time):
     """Download and save reports from Tenable.sc to SharePoint."""
     try:
         params = {'startTime': last_run_time, 'fields': 'name,type,status,finishTime'}
-        reports = sc.HTTPRequest(GET_METHOD, 'report', data=params)
+        with profiler.phase('report list'):
+            reports = sc.GetReports(params)
     except Exception as e:
         handle_error(f'Failed to fetch reports from Tenable.sc: {e}')
 
-    for report in reports.json().get('response', {}).get('usable', []):
-        if report['status'] == COMPLETED_STATUS:
-            report_data = download_report(sc, report['id'])
-            report_folder_name = report['name']
-            report_timestamp = int(report['finishTime'])
-            local_time = time.localtime(report_timestamp)
-            formatted_time = time.strftime("%Y-%m-%d-%H.%M", local_time)
-            report_filename = f'{report_folder_name}-{formatted_time}.{report["type"]}'
-            report_folder_path = os.path.join(sharepoint_path, report_folder_name)
-
-            create_directory(report_folder_path)
-
-            try:
-                report_file_path = os.path.join(report_folder_path, report_filename)
-                if not os.path.exists(report_file_path):
-                    with open(report_file_path, 'wb') as file:
-                        file.write(report_data.content)
-                logger.info(f'Report saved: {report_file_path}')
-            except OSError as e:
-                handle_error(f'Failed to save report: {report_file_path}, {e}')
-
+    recipients = dict(config.items('Emails')) if config.has_section('Emails') else {}
+    for report in reports:
+        if report.status == COMPLETED_STATUS:
             try:
-                email_reports(report_folder_name, report_filename)
+                report_file_path = deliver_report(sc, report, sharepoint_path, recipients, store, profiler.phase)
             except Exception as e:
-                handle_error(f'Failed to send email for report: {report_folder_name}, {e}')
-
-def email_reports(report_folder_name, report_filename):
-    """Send an email notification for the downloaded reports."""
-    try:
-        email_recipients = dict(config.items('Emails'))
-        for service_name, recipient in email_recipients.items():
-            if service_name.upper() == report_folder_name.upper():
-                Email.EmailSender(sharepoint_path, report_folder_name, recipient, report_filename)
-                logger.info(f'Email sent for report: {report_filename}')
-    except Exception as e:
-        handle_error(f'Failed to send email for report: {report_folder_name}, {e}')
-
-if __name__ == '__main__':
-    # Fetch Tenable.sc credentials from config
-    sc_host = config.get('tenable.sc', 'sc_host')
-    sc_username = config.get('tenable.sc', 'sc_username')
-    sc_password = config.get('tenable.sc', 'sc_password')
-
-    # Initialize Tenable.sc API
-    try:
-        sc = TenablescAPI(url=sc_host, username=sc_username, password=sc_password)
-        sc.LoginTenable()
-        logger.info("Successfully logged into Tenable.sc")
-    except Exception as e:
-        handle_error(f'Failed to connect to Tenable.sc: {e}')
-
+                handle_error(f'Failed to deliver report: {report.name}, {e}')
+            if report_file_path:
+                logger.info(f'Report delivered: {report_file_path}', extra=SAMPLED)
+            else:
+                logger.info(f'Report already delivered or being delivered: {report.name} ({report.id})', extra=SAMPLED)
+
+def run_download(config, interactive=True):
+    """
+    Download reports finished since 'Last_run' using the already initialized 'sc' client.
+    Without 'Last_run', asks for it only when 'interactive' and run from a console.
+    """
+    global sharepoint_path, store
     sharepoint_path = config.get('Reports', 'SharePoint_path')
     last_run = config.get('Reports', 'Last_run')
 
+    path = store_path(config, script_location, selected_console())
+    if path and os.path.exists(path):
+        store = VulnStore(path, window_days=config.getint('VulnStore', 'window_days', fallback=30))
+
     # Convert last run time
     if last_run:
         last_run_obj = time.mktime(datetime.strptime(last_run, "%Y-%m-%d %H:%M:%S").timetuple())
         report_downloader(sharepoint_path, last_run_obj)
+    elif not interactive or not sys.stdin.isatty():
+        logger.error("No 'Last_run' in [Reports]; set it in config.conf (format: YYYY-MM-DD HH:MM:SS)")
+        close_exit(1)
     else:
         logger.warning("No 'Last_run' in config. Please provide a valid date.")
         last_run_input = input('Enter Last_run (format: YYYY-MM-DD HH:MM:SS): ')
         last_run_obj = time.mktime(datetime.strptime(last_run_input, "%Y-%m-%d %H:%M:%S").timetuple())
         report_downloader(sharepoint_path, last_run_obj)
 
+    if store is not None:
+        store.close()
+        store = None
+
     # Update last run time in config
     current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    config.set('Reports', 'Last_run', current_time)
-    with open(config_file, 'w') as config_write:
-        config.write(config_write)
-        logger.info(f'Updated Last_run to: {current_time}')
+    save_state(config, config_file, 'Reports', {'Last_run': current_time})
+    logger.info(f'Updated Last_run to: {current_time}')
+
+if __name__ == '__main__':
+    try:
+        profiler.start(profiling_requested(config))
+
+        # With [tenable.sc:<name>] sections, run once per console in parallel
+        consoles = console_names(config)
+        if consoles and not selected_console():
+            close_exit(fan_out(logger, __file__, consoles, sys.argv[1:]))
 
-    close_exit(0)
+        # Fetch Tenable.sc credentials from config
+        sc_host = config.get('tenable.sc', 'sc_host')
+        sc_username = config.get('tenable.sc', 'sc_username')
+        sc_password = config.get('tenable.sc', 'sc_password')
+
+        # Initialize Tenable.sc API
+        try:
+            sc_cache_ttl = config.getfloat('tenable.sc', 'cache_ttl', fallback=0)
+            sc_rate_limit = config.getfloat('tenable.sc', 'rate_limit', fallback=0)
+            sc = TenablescAPI(url=sc_host, username=sc_username, password=sc_password,
+                              cache_ttl=sc_cache_ttl, rate_limit=sc_rate_limit, instance=selected_console())
+            with profiler.phase('login'):
+                sc.LoginTenable()
+            logger.info("Successfully logged into Tenable.sc")
+        except Exception as e:
+            handle_error(f'Failed to connect to Tenable.sc: {e}')
+
+        run_download(config)
+
+        close_exit(0)
+    finally:
+        # API errors exit through sys.exit() in HTTPRequest without close_exit(); still export the
+        # metrics and stop the profiler
+        if not exiting:
+            logger.error(f'Script stopped: {sys.exc_info()[1]}')
+            close_exit(1)
@@ -0,0 +1,261 @@
+'''-------------------------------------------------------------------------------
+Name:           Scheduler_Daemon.py (Main Script)
+
+Date:           19/10/2026
+
+Last update:    19/10/2026
+
+Purpose:        Long-running scheduler that runs the ServiceNow sync, report
+                creation, report download and combination-asset jobs inside
+                one process instead of four cron-spawned scripts.
+
+The following steps will be performed by the script:
+
+                1. Log into Tenable.sc once and create one ServiceNow client; every job
+                   shares these sessions, their connection pools, the GET response
+                   cache (the asset list) and the request metrics.
+                2. Run each job on its own interval from the [Daemon] section of
+                   'config.conf' (seconds, 0 disables the job):
+                        sync_interval              ServiceNow_2_Tenable.sc.py
+                        create_reports_interval    ReportCreator.py
+                        download_reports_interval  ReportDownloader.py
+                        combine_assets_interval    Combination_Asset_Creator.py
+                3. Never start a job while the previous run of the same job is still going;
+                   the overdue run is skipped and logged.
+                4. Log in again before the next job when a job failed because Tenable.sc
+                   rejected the session (HTTP 401/403); other failures keep the session
+                   and the GET cache the running jobs share.
+                   With [tenable.sc:<name>] sections in 'config.conf', each job instead
+                   runs once per console in parallel worker processes (see 'pyConsoles.py').
+                5. Export the shared request metrics after every job and stop cleanly on
+                   SIGTERM / Ctrl+C once running jobs have finished.
+
+                Run 'python Scheduler_Daemon.py --once' to run every enabled job one time
+                and exit, e.g. to test the configuration.
+
+Author:         Morteza Zeinali
+-------------------------------------------------------------------------------
+Requirements:
+
+   Please first define the credential data into 'config.conf' before running the script.
+   Each job keeps logging to its own script log; the scheduler logs to
+   'Scheduler_Daemon.log'.
+
+'''
+
+# Import python modules
+import os
+import signal
+import sys
+import threading
+import time
+from pyLogger import Logger, logging_options
+from pyMetrics import export_metrics, textfile_path
+from pyProfiler import Profiler
+from pyConsoles import console_names, fan_out, read_config
+from pyWorkers import load_script
+import pyTenableAPI
+import pyServiceNowAPI
+
+# Initialize global logging and configuration variables
+scriptloc = os.path.join(os.path.dirname(os.path.realpath(__file__)), '')
+scriptname = os.path.splitext(os.path.basename(__file__))[0]
+configfile = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.conf')
+
+# Initialize logging
+log_instance = Logger(scriptloc, scriptname)
+logger = log_instance.setup(**logging_options(read_config(configfile)))
+logger.info(f'Running on Python version {sys.version}')
+
+# Job name: (script file, default interval in seconds)
+JOBS = {
+    'sync': ('ServiceNow_2_Tenable.sc.py', 3600),
+    'create_reports': ('ReportCreator.py', 86400),
+    'download_reports': ('ReportDownloader.py', 900),
+    'combine_assets': ('Combination_Asset_Creator.py', 0),
+}
+
+# ===================================================================
+# Shared State
+# ===================================================================
+
+class Job:
+    """One scheduled job: the script module, its interval and its overlap lock"""
+
+    def __init__(self, name, module, interval):
+        self.name = name
+        self.module = module
+        self.interval = interval
+        self.next_run = time.monotonic()
+        self.lock = threading.Lock()
+        self.runs = 0
+        self.failures = 0
+
+
+class Scheduler:
+    """Runs the jobs on their intervals with one shared Tenable.sc and ServiceNow session"""
+
+    def __init__(self, config):
+        self.config = config
+        self.sc = None
+        self.sn = None
+        self.jobs = []
+        self.needs_login = True
+        # With [tenable.sc:<name>] sections every job runs once per console in its own process
+        self.consoles = console_names(config)
+        self._login_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def load_jobs(self):
+        """Import the script of every enabled job"""
+        for name, (filename, default_interval) in JOBS.items():
+            interval = self.config.getfloat('Daemon', f'{name}_interval', fallback=default_interval)
+            if interval <= 0:
+                logger.info(f'Job {name} is disabled')
+                continue
+            self.jobs.append(Job(name, load_script(scriptloc, filename), interval))
+            logger.info(f'Job {name} scheduled every {interval:.0f}s')
+
+    def login(self):
+        """Create the shared clients, or log in again after a failed job"""
+        with self._login_lock:
+            if not self.needs_login or self.consoles:
+                return
+            sc_host = self.config.get('tenable.sc', 'sc_host')
+            sc_username = self.config.get('tenable.sc', 'sc_username')
+            sc_password = self.config.get('tenable.sc', 'sc_password')
+            # The daemon keeps the asset list cached between jobs; writes invalidate it
+            sc_cache_ttl = self.config.getfloat('Daemon', 'cache_ttl',
+                                                fallback=self.config.getfloat('tenable.sc', 'cache_ttl', fallback=0))
+            sc_rate_limit = self.config.getfloat('tenable.sc', 'rate_limit', fallback=0)
+
+            if self.sc is None:
+                self.sc = pyTenableAPI.TenablescAPI(url=sc_host, username=sc_username, password=sc_password,
+                                                    cache_ttl=sc_cache_ttl, rate_limit=sc_rate_limit)
+            elif self.sc.cache is not None:
+                self.sc.cache.clear()
+            self.sc.LoginTenable()
+            logger.info("Logged in successfully to Tenable.sc!")
+
+            if self.sn is None and self.config.has_section('SrvNow'):
+                self.sn = pyServiceNowAPI.SrvNowAPI(url=self.config.get('SrvNow', 'SrvNow_url'),
+                                                    username=self.config.get('SrvNow', 'SrvNow_username'),
+                                                    password=self.config.get('SrvNow', 'SrvNow_password'))
+            self.needs_login = False
+
+    def execute(self, job):
+        """Run one job in the calling thread with the shared clients"""
+        module = job.module
+        if self.consoles:
+            if fan_out(logger, os.path.join(scriptloc, JOBS[job.name][0]), self.consoles):
+                raise RuntimeError(f'Job {job.name} failed on one or more consoles')
+            return
+
+        module.sc = self.sc
+        module.profiler = Profiler(module.logger, module.profiler.path_prefix)
+        module.profiler.start()
+
+        try:
+            if job.name == 'sync':
+                module.sn = self.sn
+                module.config = self.config
+                module.run_sync(self.config)
+            elif job.name == 'create_reports':
+                module.RunReports(self.config)
+            elif job.name == 'download_reports':
+                module.run_download(self.config, interactive=False)
+            elif job.name == 'combine_assets':
+                module.run_combination(self.sc)
+        finally:
+            # Phase times of failed runs are logged too
+            module.profiler.stop()
+
+    def run_job(self, job):
+        """Run a job unless its previous run is still going"""
+        if not job.lock.acquire(blocking=False):
+            logger.warning(f'Job {job.name} is still running, skipping this run')
+            return
+        started = time.monotonic()
+        try:
+            self.login()
+            logger.info(f'Job {job.name} started')
+            self.execute(job)
+            logger.info(f'Job {job.name} finished in {time.monotonic() - started:.1f}s')
+        except (Exception, SystemExit) as e:
+            job.failures += 1
+            # Log in again only when the session was rejected; login() clears the cache other jobs are using
+            if isinstance(e, pyTenableAPI.TenableAPIError) and e.is_auth_error:
+                self.needs_login = True
+            logger.error(f'Job {job.name} failed after {time.monotonic() - started:.1f}s: {e}', exc_info=True)
+        finally:
+            job.runs += 1
+            # Re-attach the job's log handlers if the script's exit handler closed them
+            script_log = getattr(job.module, 'log_instance', None) or job.module.loginstance
+            script_log.reopen()
+            export_metrics(logger, [self.sc and self.sc.metrics, self.sn and self.sn.metrics],
+                           textfile_path(self.config, scriptname))
+            job.lock.release()
+
+    def start_job(self, job):
+        """Run a job on its own thread so long jobs do not delay the others"""
+        thread = threading.Thread(target=self.run_job, args=(job,), name=f'job-{job.name}', daemon=True)
+        self._threads = [t for t in self._threads if t.is_alive()] + [thread]
+        thread.start()
+
+    def run_forever(self):
+        """Start every job that is due until stop() is called"""
+        while not self._stop.is_set():
+            now = time.monotonic()
+            for job in self.jobs:
+                if now >= job.next_run:
+                    job.next_run = now + job.interval
+                    self.start_job(job)
+            self._stop.wait(1)
+        self.wait()
+
+    def run_once(self):
+        """Run every enabled job one time, in order"""
+        for job in self.jobs:
+            self.run_job(job)
+
+    def stop(self, *args):
+        logger.info('Stopping scheduler after running jobs finish...')
+        self._stop.set()
+
+    def wait(self):
+        for thread in self._threads:
+            thread.join()
+
+
+def close_exit(exit_code):
+    """Handle script exit with proper cleanup"""
+    if exit_code == 0:
+        logger.info('Scheduler stopped')
+    else:
+        logger.error('Exiting scheduler due to an error')
+
+    log_instance.closeHandlers()
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    # The jobs' scripts read the same file and share this parse
+    config = read_config(configfile)
+
+    scheduler = Scheduler(config)
+    try:
+        scheduler.load_jobs()
+        scheduler.login()
+    except (Exception, SystemExit) as e:
+        logger.error(f'Failed to start the scheduler: {e}', exc_info=True)
+        close_exit(1)
+
+    if '--once' in sys.argv:
+        scheduler.run_once()
+        close_exit(1 if any(job.failures for job in scheduler.jobs) else 0)
+
+    signal.signal(signal.SIGTERM, scheduler.stop)
+    signal.signal(signal.SIGINT, scheduler.stop)
+    scheduler.run_forever()
+    close_exit(0)
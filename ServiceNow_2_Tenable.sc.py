@@ -13,10 +13,29 @@ The following steps will be performed by the script:
                 1. Query a list of the active assets from ServiceNow portal.
                 2. Create custom assets - Static IPs on Tenable Security Center.
                 3. Update/Sync tenable.sc asset data from ServiceNow portal.
-                4. Delete retired assets from tenable.sc on each run.
+                4. Delete retired assets from tenable.sc on each run, in one bulk pass
+                   capped by 'max_deletions' in [SrvNow]; above the cap the deletions
+                   are deferred to the next run, which needs the cap raised.
+                   With 'incremental = true' in [SrvNow], only services changed since
+                   the 'last_sync' watermark (less 'watermark_overlap' seconds) are
+                   processed, plus the services that failed in the previous run
+                   ('retry_services'/'retry_retired'); a full reconciliation runs
+                   every 'full_sync_days' to catch services deleted from ServiceNow.
                 5. logging script by calling 'pyLogger.py' & create a log file with
                    the same name of script 'SrvNow2Tenable.sc.log'
                 6. Pull all credential data from a configuration file named: 'config.conf'
+                7. Record applied operations in 'ServiceNow_2_Tenable.sc.journal' so an
+                   interrupted run resumes instead of starting over, if it started from the
+                   same watermark within 'resume_max_hours'.
+                8. Time each phase (login, ServiceNow fetch, diff, writes); run with
+                   '--profile' to also write cProfile/tracemalloc output next to the log.
+                9. With 'shards = N' in [SrvNow] (or '--shards N'), split the services by a
+                   stable hash of their code across N worker processes. Each worker has its
+                   own sessions, slice of the asset index, journal and log
+                   ('ServiceNow_2_Tenable.sc.shard<k>.log'); the coordinator merges their
+                   counts, errors and request metrics into one run summary.
+                10. With [tenable.sc:<name>] sections, sync every console in parallel;
+                    see 'pyConsoles.py'.
   
 
 
@@ -41,35 +60,85 @@ Requirements:
 
 # Import python modules
 import json
+import multiprocessing
 import os
 import sys
 import getpass
 import time
 import struct
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from socket import inet_aton
 from configparser import ConfigParser
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
 import requests
-from pyLogger import Logger
+from pyLogger import Logger, SAMPLED, logging_options
 import pyTenableAPI
 import pyServiceNowAPI
+from pyRecords import Asset, AssetIndex
+from pyJournal import SyncJournal
+from pyMetrics import export_metrics, textfile_path
+from pyProfiler import Profiler, profiling_requested
+from pyWorkers import call_script
+from pyConsoles import console_config, console_names, console_scriptname, fan_out, read_config, save_state, \
+    selected_console
 
 # Disable urllib3 warnings
 requests.packages.urllib3.disable_warnings()
 
 # Initialize global logging and configuration variables
 scriptloc = os.path.join(os.path.dirname(os.path.realpath(__file__)), '')
-scriptname = os.path.splitext(os.path.basename(__file__))[0]
+scriptname = console_scriptname(os.path.splitext(os.path.basename(__file__))[0])
 configfile = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.conf')
 
 # Initialize logging
 log_instance = Logger(scriptloc, scriptname)
-logger = log_instance.setup()
+logger = log_instance.setup(**logging_options(read_config(configfile)))
 logger.info(f'Running on Python version {sys.version}')
 
+# Phase timers, and cProfile/tracemalloc output with '--profile'
+profiler = Profiler(logger, scriptloc + scriptname)
+
 # Global variables for Tenable and ServiceNow connections
 sc = None
 sn = None
+config = None
+
+# Snapshot of Tenable.sc assets, loaded once per run
+asset_index = None
+
+# Write-ahead journal of applied operations, so a failed run resumes
+journal = None
+
+# Number of services that failed to sync during this run
+sync_errors = 0
+
+# Codes of the active and retired services that failed this run, retried by the next incremental run
+failed_services = set()
+failed_retired = set()
+
+# Codes of retired services whose deletion exceeded 'max_deletions', left for the next run
+deferred_retired = set()
+
+# Assets created/updated/deleted/skipped during this run, for the run summary
+sync_counts = Counter()
+
+# Set once close_exit() has cleaned up, so the main block does not clean up twice
+exiting = False
+
+# Shard number when running as a sync worker process, None in the coordinator
+shard = None
+
+# Request metrics handed back by the shard workers, exported with the coordinator's
+shard_metrics = []
+
+# Pause (seconds) before each asset write, from 'write_delay' in [tenable.sc]
+write_delay = 2
+
+# Format of the 'last_sync' watermark, matching ServiceNow 'sys_updated_on' (UTC)
+WATERMARK_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 def initialize_tenable_sc(config):
     """Initialize connection to Tenable.sc"""
@@ -78,8 +147,12 @@ def initialize_tenable_sc(config):
         sc_host = config.get('tenable.sc', 'SC_host')
         sc_username = config.get('tenable.sc', 'sc_username')
         sc_password = config.get('tenable.sc', 'sc_password')
+        sc_cache_ttl = config.getfloat('tenable.sc', 'cache_ttl', fallback=0)
+        sc_rate_limit = config.getfloat('tenable.sc', 'rate_limit', fallback=0)
 
-        sc = pyTenableAPI.TenablescAPI(url=sc_host, username=sc_username, password=sc_password)
+        sc = pyTenableAPI.TenablescAPI(url=sc_host, username=sc_username, password=sc_password,
+                                       cache_ttl=sc_cache_ttl, rate_limit=sc_rate_limit,
+                                       instance=selected_console())
         sc.LoginTenable()
         logger.info("Logged in successfully to Tenable.sc!")
     except Exception as e:
@@ -94,7 +167,8 @@ def initialize_servicenow(config):
         srv_now_username = config.get('SrvNow', 'SrvNow_username')
         srv_now_password = config.get('SrvNow', 'SrvNow_password')
 
-        sn = pyServiceNowAPI.SrvNowAPI(url=srv_now_url, username=srv_now_username, password=srv_now_password)
+        sn = pyServiceNowAPI.SrvNowAPI(url=srv_now_url, username=srv_now_username, password=srv_now_password,
+                                       instance=selected_console())
         logger.info("Logged in successfully to ServiceNow!")
     except Exception as e:
         logger.error('Failed to connect to ServiceNow server', exc_info=True)
@@ -102,85 +176,431 @@ def initialize_servicenow(config):
 
 def close_exit(exit_code):
     """Handle script exit with proper cleanup"""
+    global exiting
+    if shard is not None:
+        # In a shard worker, sync_shard() cleans up and reports the failure to the coordinator
+        raise SystemExit(exit_code)
+    exiting = True
+
     if exit_code == 0:
         logger.info('Script completed successfully')
     else:
         logger.error('Exiting script due to an error')
 
+    export_metrics(logger, [sc and sc.metrics, sn and sn.metrics, *shard_metrics],
+                   textfile_path(config, scriptname))
+    profiler.stop()
+
+    finish_journal(exit_code == 0)
+
     log_instance.closeHandlers()
     sys.exit(exit_code)
 
+def open_journal(name, config):
+    """Open the run journal; an interrupted run is resumed if it started from the same watermark within 'resume_max_hours'"""
+    global journal
+    journal = SyncJournal(scriptloc + name + '.journal',
+                          max_age=config.getfloat('SrvNow', 'resume_max_hours', fallback=12) * 3600,
+                          window=config.get('SrvNow', 'last_sync', fallback=''))
+    if journal.resumed:
+        logger.info(f'Resuming interrupted run {journal.run_id} ({len(journal.pending)} operations to retry)')
+    elif journal.expired:
+        logger.info(f'Not resuming run {journal.expired}: it is older than resume_max_hours or from another watermark')
+
+def finish_journal(success):
+    """Finish the journal once every operation was attempted, otherwise keep it for the next run"""
+    global journal
+    if journal is not None:
+        # Services that failed are retried through 'retry_services'/'retry_retired', not by resuming
+        if success:
+            journal.complete()
+        else:
+            journal.close()
+        journal = None
+
+def run_sync(config):
+    """Run one ServiceNow to Tenable.sc sync with the already initialized 'sc' and 'sn' clients"""
+    global journal, asset_index, sync_errors, sync_counts, shard_metrics, write_delay
+    asset_index = None
+    sync_errors = 0
+    failed_services.clear()
+    failed_retired.clear()
+    deferred_retired.clear()
+    sync_counts = Counter()
+    shard_metrics = []
+    write_delay = config.getfloat('tenable.sc', 'write_delay', fallback=2)
+
+    open_journal(scriptname, config)
+
+    logger.info("Processing ServiceNow asset data...")
+    success = False
+    try:
+        srv_now_asset_data(config)
+        success = True
+    finally:
+        # API errors leave through sys.exit() in HTTPRequest, which 'except Exception' does not catch
+        finish_journal(success)
+
+def load_asset_index():
+    """Load a single snapshot of Tenable.sc assets for the whole run"""
+    global asset_index
+    if asset_index is None:
+        with profiler.phase('asset snapshot'):
+            asset_index = AssetIndex(sc.GetAssets())
+        logger.info(f'Loaded {len(asset_index)} assets from Tenable.sc')
+    return asset_index
+
 def update_tenable_assets(srv_name, ipaddr):
     """Update or create Tenable.sc assets based on ServiceNow data"""
     try:
-        existing_assets = sc.HTTPRequest('GET', 'asset').json()['response']['usable']
-        asset_names = [a['name'] for a in existing_assets]
+        existing = load_asset_index().find(srv_name)
 
-        if srv_name not in asset_names:
+        if not existing:
             # Create new asset in Tenable.sc
-            time.sleep(2)
-            sc.HTTPRequest('POST', 'asset').json = {
-                'name': srv_name,
-                'description': "",
-                'groups': [],
-                'definedIPs': ipaddr,
-                'type': 'static',
-                "tags": "SVC",
-            }
-            logger.info(f'Created new asset: {srv_name}')
+            time.sleep(write_delay)
+            with profiler.phase('writes'):
+                created = sc.HTTPRequest('POST', 'asset', data={
+                    'name': srv_name,
+                    'description': "",
+                    'groups': [],
+                    'definedIPs': ipaddr,
+                    'type': 'static',
+                    "tags": "SVC",
+                }).json()['response']
+            asset_index.add(Asset.from_json(created))
+            logger.info(f'Created new asset: {srv_name}', extra=SAMPLED)
+            sync_counts['created'] += 1
         else:
-            # Update existing asset IP addresses
-            for asset in existing_assets:
-                if srv_name == asset['name']:
-                    time.sleep(2)
-                    sc.HTTPRequest('PATCH', f'asset/{asset["id"]}').json = {'definedIPs': ipaddr}
-                    logger.info(f'Updated asset: {srv_name}')
+            # Update the IP addresses of every asset with the service name
+            for asset in existing:
+                time.sleep(write_delay)
+                with profiler.phase('writes'):
+                    sc.HTTPRequest('PATCH', f'asset/{asset.id}', data={'definedIPs': ipaddr})
+                asset.defined_ips = ipaddr
+                logger.info(f'Updated asset: {srv_name}', extra=SAMPLED)
+                sync_counts['updated'] += 1
     except Exception as e:
         logger.error('Failed to create or update asset in Tenable.sc', exc_info=True)
         close_exit(1)
 
-def delete_retired_assets(retired_asset):
-    """Delete retired assets from Tenable.sc"""
-    try:
-        assets = sc.HTTPRequest('GET', 'asset').json()['response']['usable']
-        for asset in assets:
-            if retired_asset == asset["name"]:
-                sc.HTTPRequest('DELETE', f'asset/{asset["id"]}')
-                logger.info(f'Deleted retired asset: {retired_asset}')
-    except Exception as e:
-        logger.error('Failed to delete asset in Tenable.sc', exc_info=True)
-        close_exit(1)
-
-def srv_now_asset_data():
+def delete_retired_assets(retired_codes, max_deletions, max_workers):
+    """Delete every Tenable.sc asset whose service is retired, in one bulk pass"""
+    global sync_errors
+    retired_codes = set(retired_codes)
+    matches = [asset for asset in load_asset_index() if asset.name in retired_codes]
+    if not matches:
+        return
+
+    # Refuse suspiciously large deletions instead of wiping the console
+    if max_deletions and len(matches) > max_deletions:
+        defer_deletions(retired_codes, len(matches), max_deletions)
+        return
+
+    def delete_asset(asset):
+        sc.HTTPRequest('DELETE', f'asset/{asset.id}')
+        return asset
+
+    for asset in matches:
+        journal.planned(f'delete:{asset.name}:{asset.id}')
+
+    with profiler.phase('deletes'), ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(delete_asset, asset): asset for asset in matches}
+        for future in as_completed(futures):
+            asset = futures[future]
+            try:
+                future.result()
+                asset_index.remove(asset.id)
+                journal.done(f'delete:{asset.name}:{asset.id}')
+                sync_counts['deleted'] += 1
+                logger.info(f'Deleted retired asset: {asset.name}', extra=SAMPLED)
+            except (Exception, SystemExit) as e:
+                sync_errors += 1
+                failed_retired.add(asset.name)
+                logger.error(f'Failed to delete asset {asset.name} in Tenable.sc: {e}')
+
+def defer_deletions(retired_codes, deletions, max_deletions):
+    """Leave deletions over 'max_deletions' for the next run; a guard, not a sync error"""
+    logger.warning(f'{deletions} retired assets exceed max_deletions={max_deletions}; deferring their deletion '
+                   'to the next run, please review and raise the limit if intended')
+    deferred_retired.update(retired_codes)
+    sync_counts['deferred'] += deletions
+
+def srv_now_asset_data(config):
     """Fetch and process asset data from ServiceNow"""
     try:
-        srv_now_assets = sn.HTTPRequest('GET', 'service_list').json()['result']['service_codes']
-        assets = json.loads(srv_now_assets)
+        run_started = utc_now().strftime(WATERMARK_FORMAT)
+        full_sync = is_full_sync_due(config)
 
-        for asset in assets:
-            if asset["operational_status"] == "Retired":
-                delete_retired_assets(asset['code'])
+        with profiler.phase('servicenow fetch'):
+            if full_sync:
+                logger.info('Running full reconciliation against ServiceNow')
+                assets = fetch_services()
             else:
+                # Step back from the watermark to allow for clock skew between this host and ServiceNow
+                overlap = config.getfloat('SrvNow', 'watermark_overlap', fallback=300)
+                since = (datetime.strptime(config.get('SrvNow', 'last_sync'), WATERMARK_FORMAT)
+                         - timedelta(seconds=overlap)).strftime(WATERMARK_FORMAT)
+                logger.info(f'Running incremental sync for changes since {since}')
+                assets = fetch_changed_services(config, since)
+                changed = {asset['code'] for asset in assets}
+                assets += [asset for asset in retry_services(config) if asset['code'] not in changed]
+        logger.info(f'{len(assets)} services to process')
+
+        retired_codes = {asset['code'] for asset in assets if asset["operational_status"] == "Retired"}
+        active_assets = [asset for asset in assets if asset["operational_status"] != "Retired"]
+
+        # Reconciliation in incremental mode also catches services deleted outright
+        if full_sync and config.getboolean('SrvNow', 'incremental', fallback=False):
+            retired_codes |= find_orphaned_assets(assets)
+
+        max_deletions = config.getint('SrvNow', 'max_deletions', fallback=50)
+        shards = shard_count(config)
+        if shards > 1:
+            run_shards(active_assets, retired_codes, shards, max_deletions)
+        else:
+            for asset in active_assets:
                 process_active_assets(asset)
+            delete_retired_assets(retired_codes, max_deletions=max_deletions,
+                                  max_workers=config.getint('tenable.sc', 'max_workers', fallback=4))
     except Exception as e:
         logger.error('Failed to fetch data from ServiceNow', exc_info=True)
         close_exit(1)
 
+    logger.info(f'Run summary: {len(assets)} services, '
+                + ', '.join(f'{sync_counts[name]} {name}'
+                          for name in ('created', 'updated', 'deleted', 'deferred', 'skipped'))
+                + f', {sync_errors} errors')
+
+    # Advance the watermark past the services that succeeded; the failed ones are retried by the next run
+    if failed_services or failed_retired:
+        logger.warning(f'{len(failed_services) + len(failed_retired)} services failed; '
+                       'they are retried by the next incremental run')
+    save_watermark(config, run_started, full_sync)
+
+def shard_count(config):
+    """Number of sync worker processes, from '--shards N' or 'shards' in [SrvNow]"""
+    try:
+        if '--shards' in sys.argv:
+            return max(1, int(sys.argv[sys.argv.index('--shards') + 1]))
+        return max(1, config.getint('SrvNow', 'shards', fallback=1))
+    except (IndexError, ValueError):
+        logger.error("Invalid number of shards: '--shards' and 'shards' in [SrvNow] take a whole number")
+        close_exit(1)
+
+def shard_of(code, shards):
+    """Stable shard number of a service code, the same on every run and in every process"""
+    return zlib.crc32(code.encode('utf-8')) % shards
+
+def run_shards(active_assets, retired_codes, shards, max_deletions):
+    """Coordinator: sync the services across worker processes and merge their results"""
+    global asset_index, sync_errors
+    index = load_asset_index()
+
+    # The deletion cap applies to the whole run, so it is checked before the work is split
+    deletions = sum(len(index.find(code)) for code in retired_codes)
+    if max_deletions and deletions > max_deletions:
+        defer_deletions(retired_codes, deletions, max_deletions)
+        retired_codes = set()
+
+    # Per shard: active services, retired codes and the matching slice of the asset index
+    slices = [([], [], []) for _ in range(shards)]
+    for asset in active_assets:
+        slices[shard_of(asset['code'], shards)][0].append(asset)
+    for code in retired_codes:
+        slices[shard_of(code, shards)][1].append(code)
+    for asset in index:
+        slices[shard_of(asset.name, shards)][2].append(asset)
+
+    logger.info(f'Syncing {len(active_assets)} services across {shards} worker processes')
+    # Spawned, not forked: this process may run other threads (e.g. under Scheduler_Daemon.py)
+    context = multiprocessing.get_context('spawn')
+    with profiler.phase('shards'), ProcessPoolExecutor(max_workers=shards, mp_context=context) as executor:
+        futures = {executor.submit(call_script, __file__, 'sync_shard', number, *slices[number]): number
+                   for number in range(shards)}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                sync_errors += 1
+                active, retired, _ = slices[futures[future]]
+                failed_services.update(asset['code'] for asset in active)
+                failed_retired.update(retired)
+                logger.error(f'Sync worker failed: {e}')
+                continue
+            sync_errors += result['errors']
+            failed_services.update(result['failed_services'])
+            failed_retired.update(result['failed_retired'])
+            sync_counts.update(result['counts'])
+            shard_metrics.extend(result['metrics'])
+            logger.info(f'Shard {result["shard"]}: {result["services"]} services, {result["counts"]}, '
+                        f'{result["errors"]} errors in {result["seconds"]:.1f}s')
+
+    # The workers changed assets behind this process's snapshot and GET cache
+    asset_index = None
+    if sc.cache is not None:
+        sc.cache.clear()
+
+def sync_shard(number, active_assets, retired_codes, assets):
+    """Worker process: sync one shard with its own sessions, asset index slice, journal and log"""
+    global shard, logger, log_instance, profiler, config, sc, sn
+    global asset_index, journal, sync_errors, sync_counts, write_delay
+    started = time.perf_counter()
+    shard = number
+    shard_name = f'{scriptname}.shard{shard}'
+
+    # Log to a file per shard instead of through the handlers inherited from the coordinator
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    log_instance = Logger(scriptloc, shard_name)
+    logger = log_instance.setup(**logging_options(read_config(configfile)))
+    config = setup_config()
+    profiler = Profiler(logger, scriptloc + shard_name)
+    profiler.start(profiling_requested(config))
+    sc = sn = None
+    asset_index = AssetIndex(assets)
+    sync_errors = 0
+    sync_counts = Counter()
+    write_delay = config.getfloat('tenable.sc', 'write_delay', fallback=2)
+
+    open_journal(shard_name, config)
+    logger.info(f'Shard {shard}: {len(active_assets)} services, {len(retired_codes)} retired, '
+                f'{len(asset_index)} assets')
+
+    success = False
+    try:
+        with profiler.phase('login'):
+            initialize_tenable_sc(config)
+            initialize_servicenow(config)
+        # Own label, so the console label of a [tenable.sc:<name>] run is kept
+        sc.metrics.shard = sn.metrics.shard = str(shard)
+
+        for asset in active_assets:
+            process_active_assets(asset)
+        # The coordinator already applied max_deletions to the whole run
+        delete_retired_assets(retired_codes, max_deletions=0,
+                              max_workers=config.getint('tenable.sc', 'max_workers', fallback=4))
+        success = True
+    except (Exception, SystemExit) as e:
+        sync_errors += 1
+        # Services after the failure were not reached; they are retried by the next run
+        failed_services.update(asset['code'] for asset in active_assets)
+        failed_retired.update(retired_codes)
+        logger.error(f'Shard {shard} stopped early: {e}')
+    finally:
+        profiler.stop()
+        finish_journal(success)
+        log_instance.closeHandlers()
+
+    return {
+        'shard': shard,
+        'services': len(active_assets),
+        'errors': sync_errors,
+        'counts': dict(sync_counts),
+        'failed_services': sorted(failed_services),
+        'failed_retired': sorted(failed_retired),
+        'metrics': [client.metrics for client in (sc, sn) if client is not None],
+        'seconds': time.perf_counter() - started,
+    }
+
+def fetch_services(query=None):
+    """Fetch the service list from ServiceNow, optionally filtered by an encoded query"""
+    endpoint = 'service_list' if query is None else f'service_list?sysparm_query={quote(query, safe="")}'
+    srv_now_assets = sn.HTTPRequest('GET', endpoint).json()['result']['service_codes']
+    return json.loads(srv_now_assets)
+
+def fetch_changed_services(config, watermark):
+    """
+    Fetch services whose own record changed since the watermark and, with 'delta_ip_query = true'
+    in [SrvNow], services whose server-IP records changed.
+
+    The scripted 'asset' resource is only known to take one 'w_service_id'. Filtering it by
+    'sys_updated_on' is an assumption that the benchmark mock implements; enable 'delta_ip_query'
+    only where the instance's scripted API supports it. Otherwise IP-only changes are picked up
+    by the full reconciliation every 'full_sync_days'.
+    """
+    changed = {asset['code']: asset for asset in fetch_services(f'sys_updated_on>={watermark}')}
+    if not config.getboolean('SrvNow', 'delta_ip_query', fallback=False):
+        return list(changed.values())
+
+    # Services whose server-IP records changed but whose service record did not
+    srv_now_ip_list = sn.HTTPRequest('POST', 'asset', data={'sys_updated_on': watermark}).json()['result']
+    for ip in json.loads(srv_now_ip_list['server_ip_list']):
+        code = ip.get('w_service_id')
+        if code and code not in changed:
+            changed[code] = {'code': code, 'operational_status': ip.get('operational_status', '')}
+
+    return list(changed.values())
+
+def retry_services(config):
+    """Services that failed in the previous run, saved by save_watermark()"""
+    return ([{'code': code, 'operational_status': 'Operational'}
+             for code in config.get('SrvNow', 'retry_services', fallback='').split()]
+            + [{'code': code, 'operational_status': 'Retired'}
+               for code in config.get('SrvNow', 'retry_retired', fallback='').split()])
+
+def find_orphaned_assets(assets):
+    """Return ServiceNow-managed asset names whose service no longer exists in ServiceNow"""
+    known = {asset['code'] for asset in assets}
+    orphaned = {asset.name for asset in load_asset_index() if asset.tags == 'SVC' and asset.name not in known}
+    for name in orphaned:
+        logger.info(f'Service {name} no longer exists in ServiceNow')
+    return orphaned
+
+def is_full_sync_due(config):
+    """Decide whether this run needs a full reconciliation instead of a delta sync"""
+    if not config.getboolean('SrvNow', 'incremental', fallback=False):
+        return True
+    last_sync = config.get('SrvNow', 'last_sync', fallback='')
+    last_full_sync = config.get('SrvNow', 'last_full_sync', fallback='')
+    if not last_sync or not last_full_sync:
+        return True
+    full_sync_days = config.getfloat('SrvNow', 'full_sync_days', fallback=7)
+    age = utc_now() - datetime.strptime(last_full_sync, WATERMARK_FORMAT)
+    return age.total_seconds() >= full_sync_days * 86400
+
+def utc_now():
+    """Current UTC time as a naive datetime, comparable with WATERMARK_FORMAT timestamps"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def save_watermark(config, run_started, full_sync):
+    """Persist the high-watermark of the last completed run, and the services to retry, to 'config.conf'"""
+    watermarks = {'last_sync': run_started,
+                  'retry_services': ' '.join(sorted(failed_services)),
+                  'retry_retired': ' '.join(sorted(failed_retired | deferred_retired))}
+    if full_sync:
+        watermarks['last_full_sync'] = run_started
+    save_state(config, configfile, 'SrvNow', watermarks)
+    logger.info(f'Updated sync watermark to: {run_started}')
+
 def process_active_assets(asset):
     """Process active assets from ServiceNow"""
+    global sync_errors
     try:
         data = {'w_service_id': asset['code']}
-        srv_now_ip_list = sn.HTTPRequest('POST', 'asset', data=data).json()['result']
-        ips_lists = json.loads(srv_now_ip_list['server_ip_list'])
-
-        if ips_lists:
-            ips_prod = [ip['ip_address'] for ip in ips_lists if is_ipv4(ip['ip_address']) and ip['used_for'] == "Production"]
-            if ips_prod:
-                sorted_ips_prod = sorted(ips_prod, key=lambda ip: struct.unpack("!L", inet_aton(ip))[0])
-                srv_ips_prod = ', '.join(sorted_ips_prod)
-                logger.info(f'Service {asset["code"]} with production IPs: {srv_ips_prod}')
-                update_tenable_assets(asset['code'], srv_ips_prod)
+        with profiler.phase('servicenow fetch'):
+            srv_now_ip_list = sn.HTTPRequest('POST', 'asset', data=data).json()['result']
+            ips_lists = json.loads(srv_now_ip_list['server_ip_list'])
+
+        with profiler.phase('diff'):
+            ips_prod = [ip['ip_address'] for ip in ips_lists or [] if is_ipv4(ip['ip_address']) and ip['used_for'] == "Production"]
+            sorted_ips_prod = sorted(ips_prod, key=lambda ip: struct.unpack("!L", inet_aton(ip))[0])
+            srv_ips_prod = ', '.join(sorted_ips_prod)
+
+        # Keyed on the IPs, so a resumed run still applies IPs that changed after the interrupted run
+        op = f'service:{asset["code"]}:{zlib.crc32(srv_ips_prod.encode("utf-8")):08x}'
+        if journal.is_done(op):
+            logger.info(f'Skipping {asset["code"]}, already applied in run {journal.run_id}', extra=SAMPLED)
+            sync_counts['skipped'] += 1
+            return
+
+        journal.planned(op)
+        if srv_ips_prod:
+            logger.info(f'Service {asset["code"]} with production IPs: {srv_ips_prod}', extra=SAMPLED)
+            update_tenable_assets(asset['code'], srv_ips_prod)
+        journal.done(op)
     except Exception as e:
+        sync_errors += 1
+        failed_services.add(asset['code'])
         logger.error('Error processing active assets', exc_info=True)
 
 def is_ipv4(ip):
@@ -193,8 +613,8 @@ def is_ipv4(ip):
 
 def setup_config():
     """Setup or read configuration file"""
-    config = ConfigParser(delimiters=('=', ','))
     if not os.path.exists(configfile):
+        config = ConfigParser(delimiters=('=', ','))
         config.add_section('tenable.sc')
         config.set('tenable.sc', 'SC_host', input('Tenable.sc Hostname or IP: '))
         config.set('tenable.sc', 'sc_username', input('Tenable.sc Username: '))
@@ -208,15 +628,32 @@ def setup_config():
         with open(configfile, 'w') as f:
             config.write(f)
     else:
-        config.read(configfile)
-    return config
+        config = read_config(configfile)
+    return console_config(config, selected_console())
 
 if __name__ == '__main__':
-    config = setup_config()
-    initialize_tenable_sc(config)
-    initialize_servicenow(config)
-    
-    logger.info("Processing ServiceNow asset data...")
-    srv_now_asset_data()
-
-    close_exit(0)
+    try:
+        config = setup_config()
+        profiler.start(profiling_requested(config))
+
+        # With [tenable.sc:<name>] sections, run once per console in parallel
+        consoles = console_names(config)
+        if consoles and not selected_console():
+            close_exit(fan_out(logger, __file__, consoles, sys.argv[1:]))
+
+        # Reject a bad '--shards' before logging in
+        shard_count(config)
+
+        with profiler.phase('login'):
+            initialize_tenable_sc(config)
+            initialize_servicenow(config)
+
+        run_sync(config)
+
+        close_exit(0)
+    finally:
+        # API errors exit through sys.exit() in HTTPRequest without close_exit(); still export the
+        # metrics, stop the profiler and keep the journal for the next run
+        if not exiting:
+            logger.error(f'Script stopped: {sys.exc_info()[1]}')
+            close_exit(1)
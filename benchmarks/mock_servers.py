@@ -0,0 +1,342 @@
+"""
+-------------------------------------------------------------------------------
+Name:           mock_servers.py
+
+Date:           19/10/2026
+
+Last Update:    19/10/2026
+
+Purpose:        Local stand-ins for the Tenable.sc and ServiceNow REST APIs,
+                used by 'run_benchmarks.py' to measure the main scripts
+                without production systems.
+
+Author:         Morteza Zeinali
+-------------------------------------------------------------------------------
+Emulated endpoints:
+
+   Tenable.sc  (base URL http://127.0.0.1:<port>/rest/)
+        POST   token
+        GET    asset                 POST asset     PATCH/DELETE asset/<id>
+        POST   analysis              (vulndetails, paged by start/endOffset)
+        GET    report                POST report/<id>/download
+        POST   reportDefinition      POST reportDefinition/<id>/launch
+
+   ServiceNow  (base URL http://127.0.0.1:<port>/api/VM/)
+        GET    service_list          (optionally filtered by sysparm_query)
+        POST   asset                 (server IP list for one 'w_service_id')
+
+   Every server takes a fixed per-request latency and an error rate; a
+   failing request answers HTTP 500 with an 'error_msg' like the real APIs.
+   Request counts are kept per 'METHOD endpoint-template'.
+-------------------------------------------------------------------------------
+"""
+
+# Import required Python modules
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+SEVERITIES = ('Info', 'Low', 'Medium', 'High', 'Critical')
+
+# Asset names Combination_Asset_Creator.py combines; served even when the dataset has no such services
+COMBINATION_ASSETS = ('740', '741', '742', '743')
+
+
+class Dataset:
+    """
+    A deterministic synthetic CMDB + Tenable.sc dataset.
+
+    Service codes are '1'..'services'; every 'retired_every'-th service is
+    retired and every 'changed_every'-th one counts as changed for delta
+    queries. The two intervals are coprime, so most changed services are
+    active ones the delta sync updates. Each service has 'ips_per_service' server IPs. A launched
+    report runs for 'report_seconds' before it is listed as completed.
+    """
+
+    def __init__(self, services: int = 1000, ips_per_service: int = 4, vulns_per_asset: int = 20,
+                 reports: int = 50, report_bytes: int = 256 * 1024, retired_every: int = 50,
+                 changed_every: int = 97, report_seconds: float = 2, seed: int = 1):
+        self.services = services
+        self.ips_per_service = ips_per_service
+        self.vulns_per_asset = vulns_per_asset
+        self.reports = reports
+        self.report_bytes = report_bytes
+        self.report_seconds = report_seconds
+        self.retired_every = retired_every
+        self.changed_every = changed_every
+        self.seed = seed
+
+    def status(self, code: int) -> str:
+        return 'Retired' if code % self.retired_every == 0 else 'Operational'
+
+    def service_codes(self, changed_only: bool = False) -> list:
+        return [{'code': str(code), 'operational_status': self.status(code)}
+                for code in range(1, self.services + 1)
+                if not changed_only or code % self.changed_every == 0]
+
+    def server_ips(self, code: int) -> list:
+        base = code * self.ips_per_service
+        return [{'ip_address': f'10.{(base + i) >> 16 & 255}.{(base + i) >> 8 & 255}.{(base + i) & 255}',
+                 'used_for': 'Production' if i % 4 != 3 else 'Test'}
+                for i in range(self.ips_per_service)]
+
+    def vulns(self, asset_id: str) -> list:
+        rng = random.Random(f'{self.seed}-{asset_id}')
+        now = int(time.time())
+        return [{'pluginID': str(rng.randint(10000, 180000)),
+                 'pluginName': f'Plugin {rng.randint(1, 500)}',
+                 'ip': f'10.0.{rng.randint(0, 255)}.{rng.randint(1, 254)}',
+                 'port': str(rng.choice((0, 22, 80, 443, 3389))),
+                 'protocol': rng.choice(('TCP', 'UDP')),
+                 'severity': {'id': str(sev), 'name': SEVERITIES[sev]},
+                 'firstSeen': str(now - rng.randint(86400, 86400 * 365)),
+                 'lastSeen': str(now - rng.randint(0, 86400 * 30))}
+                for sev in (rng.randint(0, 4) for _ in range(self.vulns_per_asset))]
+
+
+class MockServer:
+    """
+    Base class: a threaded HTTP server with latency, error injection and
+    request counting. Subclasses implement handle(method, path, query, body).
+    """
+
+    prefix = '/'
+
+    def __init__(self, dataset: Dataset, latency: float = 0.0, error_rate: float = 0.0, port: int = 0):
+        """
+        Args:
+            dataset (Dataset): Synthetic data to serve
+            latency (float): Seconds added to every request
+            error_rate (float): Probability (0..1) of answering HTTP 500
+            port (int): Port to bind on 127.0.0.1; 0 picks a free one
+        """
+        self.dataset = dataset
+        self.latency = latency
+        self.error_rate = error_rate
+        self.counts = {}
+        self.response_bytes = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(dataset.seed)
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self._httpd.server_address[1]}{self.prefix}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def reset_counts(self):
+        with self._lock:
+            self.counts.clear()
+            self.response_bytes = 0
+
+    def _count(self, method: str, path: str, nbytes: int):
+        template = re.sub(r'/\d+', '/{id}', path)
+        with self._lock:
+            key = f'{method} {template}'
+            self.counts[key] = self.counts.get(key, 0) + 1
+            self.response_bytes += nbytes
+
+    def _inject_error(self) -> bool:
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def handle(self, method: str, path: str, query: str, body: dict):
+        """Returns (status, payload, extra headers); payload is dict or bytes."""
+        raise NotImplementedError
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; with Nagle on, each keep-alive
+            # response waits for the client's delayed ACK (~40 ms)
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _serve(self, method):
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                try:
+                    body = json.loads(raw) if raw else {}
+                except ValueError:
+                    body = {}
+                parts = urlsplit(self.path)
+                path = parts.path[len(server.prefix):] if parts.path.startswith(server.prefix) else parts.path
+
+                if server.latency:
+                    time.sleep(server.latency)
+                if server._inject_error():
+                    status, payload, headers = 500, {'error_msg': 'Injected error'}, {}
+                else:
+                    try:
+                        status, payload, headers = server.handle(method, path, parts.query, body)
+                    except Exception as e:
+                        status, payload, headers = 500, {'error_msg': str(e)}, {}
+
+                data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+                server._count(method, path, len(data))
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/octet-stream' if isinstance(payload, bytes)
+                                 else 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._serve('GET')
+
+            def do_POST(self):
+                self._serve('POST')
+
+            def do_PATCH(self):
+                self._serve('PATCH')
+
+            def do_DELETE(self):
+                self._serve('DELETE')
+
+        return Handler
+
+
+class TenableMock(MockServer):
+    """Tenable.sc stand-in for the endpoints the main scripts call."""
+
+    prefix = '/rest/'
+
+    def __init__(self, dataset: Dataset, **kwargs):
+        super().__init__(dataset, **kwargs)
+        # Odd and retired services already exist as assets, so the sync creates, updates and deletes
+        self.assets = {}
+        for code in range(1, dataset.services + 1):
+            if code % 2 or dataset.status(code) == 'Retired':
+                self._add_asset(str(code), 'SVC', 'static')
+        # Not tagged 'SVC', so the sync's reconciliation does not treat them as orphaned services
+        for name in COMBINATION_ASSETS:
+            if int(name) > dataset.services:
+                self._add_asset(name, '', 'static')
+        self.next_report_id = 1
+        self.definitions = {}
+        # Launched report results: id -> (definition name, launch time)
+        self.launched = {}
+
+    def _add_asset(self, name: str, tags: str, asset_type: str, defined_ips: str = '') -> dict:
+        with self._lock:
+            asset_id = str(len(self.assets) + 1000)
+            while asset_id in self.assets:
+                asset_id = str(int(asset_id) + 1)
+            asset = {'id': asset_id, 'name': name, 'type': asset_type, 'tags': tags, 'definedIPs': defined_ips}
+            self.assets[asset_id] = asset
+        return asset
+
+    def handle(self, method, path, query, body):
+        if path == 'token' and method == 'POST':
+            return 200, {'response': {'token': 123456}}, {'Set-Cookie': 'TNS_SESSIONID=benchmark; path=/'}
+
+        if path == 'asset' and method == 'GET':
+            with self._lock:
+                usable = list(self.assets.values())
+            return 200, {'response': {'usable': usable, 'manageable': []}}, {}
+        if path == 'asset' and method == 'POST':
+            asset = self._add_asset(body.get('name', ''), body.get('tags', ''), body.get('type', 'static'),
+                                    body.get('definedIPs', ''))
+            return 200, {'response': asset}, {}
+        match = re.fullmatch(r'asset/(\d+)', path)
+        if match and method in ('PATCH', 'DELETE'):
+            with self._lock:
+                asset = self.assets.get(match.group(1))
+                if asset is None:
+                    return 403, {'error_msg': 'Asset not found'}, {}
+                if method == 'DELETE':
+                    del self.assets[match.group(1)]
+                else:
+                    asset.update({k: v for k, v in body.items() if k in ('definedIPs', 'combinations')})
+            return 200, {'response': asset}, {}
+
+        if path == 'analysis' and method == 'POST':
+            query_body = body.get('query', {})
+            asset_id = ''
+            for flt in query_body.get('filters', []):
+                if flt.get('filterName') == 'asset':
+                    asset_id = str(flt['value']['id'])
+            rows = self.dataset.vulns(asset_id or 'all')
+            start = int(query_body.get('startOffset', 0))
+            end = int(query_body.get('endOffset', len(rows)))
+            return 200, {'response': {'totalRecords': str(len(rows)), 'returnedRecords': len(rows[start:end]),
+                                      'results': rows[start:end]}}, {}
+
+        if path == 'report' and method == 'GET':
+            finish = int(time.time()) - 60
+            usable = [{'id': str(i), 'name': str(i), 'type': 'pdf', 'status': 'Completed',
+                       'finishTime': str(finish - i)} for i in range(1, self.dataset.reports + 1)]
+            now = time.time()
+            with self._lock:
+                launched = list(self.launched.items())
+            for result_id, (name, launched_at) in launched:
+                done = now - launched_at >= self.dataset.report_seconds
+                usable.append({'id': result_id, 'name': name, 'type': 'pdf',
+                               'status': 'Completed' if done else 'Running',
+                               'finishTime': str(int(launched_at + self.dataset.report_seconds)) if done else '-1'})
+            return 200, {'response': {'usable': usable, 'manageable': []}}, {}
+        match = re.fullmatch(r'report/(\d+)/download', path)
+        if match and method == 'POST':
+            return 200, b'%PDF' + b'\0' * max(0, self.dataset.report_bytes - 4), {}
+
+        if path == 'reportDefinition' and method == 'POST':
+            with self._lock:
+                report_id = self.next_report_id
+                self.next_report_id += 1
+                self.definitions[str(report_id)] = body.get('name', str(report_id))
+            return 200, {'response': {'id': str(report_id)}}, {}
+        match = re.fullmatch(r'reportDefinition/(\d+)/launch', path)
+        if match and method == 'POST':
+            with self._lock:
+                name = self.definitions.get(match.group(1))
+                if name is None:
+                    return 403, {'error_msg': 'Report definition not found'}, {}
+                result_id = str(self.dataset.reports + len(self.launched) + 1)
+                self.launched[result_id] = (name, time.time())
+            return 200, {'response': {'reportResult': {'id': result_id}}}, {}
+
+        return 404, {'error_msg': f'Unknown endpoint {method} {path}'}, {}
+
+
+class ServiceNowMock(MockServer):
+    """ServiceNow stand-in for the custom 'VM' scripted REST API."""
+
+    prefix = '/api/VM/'
+
+    def handle(self, method, path, query, body):
+        if path == 'service_list' and method == 'GET':
+            services = self.dataset.service_codes(changed_only='sysparm_query' in query)
+            return 200, {'result': {'service_codes': json.dumps(services)}}, {}
+
+        if path == 'asset' and method == 'POST':
+            if 'w_service_id' in body:
+                ips = self.dataset.server_ips(int(body['w_service_id']))
+            else:
+                # Delta query: server-IP records changed since a watermark
+                ips = [dict(ip, w_service_id=str(code), operational_status=self.dataset.status(code))
+                       for code in range(self.dataset.changed_every // 2, self.dataset.services + 1,
+                                         self.dataset.changed_every)
+                       for ip in self.dataset.server_ips(code)[:1]]
+            return 200, {'result': {'server_ip_list': json.dumps(ips)}}, {}
+
+        return 404, {'error_msg': f'Unknown endpoint {method} {path}'}, {}
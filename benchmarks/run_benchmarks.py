@@ -0,0 +1,270 @@
+"""
+-------------------------------------------------------------------------------
+Name:           run_benchmarks.py
+
+Date:           19/10/2026
+
+Last Update:    19/10/2026
+
+Purpose:        Offline benchmark harness for the main scripts. Starts the
+                local Tenable.sc and ServiceNow stand-ins from
+                'mock_servers.py', runs each flow against them and reports
+                wall time, throughput, request counts and peak RSS. With psutil
+                installed the RSS sums the script and its worker processes;
+                otherwise it is the largest single one of them.
+
+Author:         Morteza Zeinali
+-------------------------------------------------------------------------------
+Usage:
+        python benchmarks/run_benchmarks.py
+        python benchmarks/run_benchmarks.py --sizes 1000 10000 100000 --flows sync
+        python benchmarks/run_benchmarks.py --latency 0.02 --error-rate 0.001 --attempts 3
+        python benchmarks/run_benchmarks.py --output bench_output.txt
+        python benchmarks/run_benchmarks.py --flows sync --sizes 100000 --shards 8
+        python benchmarks/run_benchmarks.py --consoles 3
+        python benchmarks/run_benchmarks.py --flows create --track-reports --report-seconds 5
+
+   Each flow runs the unmodified main script in a scratch directory with a
+   generated 'config.conf' pointing at the mocks ('write_delay = 0', so the
+   scripts' pause between writes does not hide the real cost). With
+   '--attempts N' a failed run is restarted up to N times, which exercises
+   the sync journal's resume path under error injection.
+
+   Flows:   sync      ServiceNow_2_Tenable.sc.py    (throughput = services/s)
+            create    ReportCreator.py              (throughput = assets/s)
+            download  ReportDownloader.py           (throughput = reports/s)
+            combine   Combination_Asset_Creator.py  (throughput = runs/s)
+-------------------------------------------------------------------------------
+"""
+
+# Import required Python modules
+import argparse
+import glob
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from configparser import ConfigParser
+
+from mock_servers import Dataset, ServiceNowMock, TenableMock
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FLOWS = {
+    'sync': 'ServiceNow_2_Tenable.sc.py',
+    'create': 'ReportCreator.py',
+    'download': 'ReportDownloader.py',
+    'combine': 'Combination_Asset_Creator.py',
+}
+
+# What the peak RSS of a run covers, printed under the results
+RSS_SCOPES = {
+    'tree': 'peak of the script and all its worker processes together, sampled every 50 ms with psutil',
+    'largest': 'peak of the largest single process, the script or one of its workers '
+               '(install psutil to sum the whole process tree)',
+    'none': 'not measured (install psutil)',
+}
+
+
+def prepare_workdir(workdir: str):
+    """Copies the scripts and the email template into a scratch directory."""
+    for path in glob.glob(os.path.join(REPO_DIR, '*.py')) + [os.path.join(REPO_DIR, 'email_msg.html')]:
+        shutil.copy(path, workdir)
+    os.makedirs(os.path.join(workdir, 'reports'), exist_ok=True)
+
+
+def write_config(workdir: str, sc_mocks: list, sn_mock: ServiceNowMock, args, services: int):
+    """Writes a 'config.conf' that points every script at the mocks (one [tenable.sc:<n>] per console)."""
+    config = ConfigParser(delimiters=('=', ','))
+    config['SrvNow'] = {
+        'srvnow_url': sn_mock.url,
+        'srvnow_username': 'benchmark',
+        'srvnow_password': 'benchmark',
+        'incremental': 'false',
+        # The ServiceNow mock answers the server-IP delta query
+        'delta_ip_query': 'true',
+        'max_deletions': '0',
+        'shards': str(args.shards),
+    }
+    config['tenable.sc'] = {
+        'sc_host': sc_mocks[0].url,
+        'sc_username': 'benchmark',
+        'sc_password': 'benchmark',
+        'cache_ttl': str(args.cache_ttl),
+        'rate_limit': '0',
+        'max_workers': str(args.max_workers),
+        'write_delay': '0',
+    }
+    if len(sc_mocks) > 1:
+        for number, sc_mock in enumerate(sc_mocks, 1):
+            config[f'tenable.sc:console{number}'] = {'sc_host': sc_mock.url}
+    config['VulnStore'] = {'path': 'vulns.db' if args.vuln_store else '', 'max_workers': str(args.max_workers)}
+    config['Metrics'] = {'textfile_dir': workdir}
+    config['Profiling'] = {'enabled': 'true' if args.profile else 'false'}
+    config['Reports'] = {
+        'sharepoint_path': os.path.join(workdir, 'reports', ''),
+        'last_run': '2019-09-16 13:27:38',
+        'track_timeout': '600' if args.track_reports else '0',
+        'poll_interval': '0.5',
+        'max_poll_interval': '5',
+    }
+    config['CustomReport'] = {str(code): '' for code in range(1, min(services, args.report_assets) + 1)}
+    config['Emails'] = {}
+    with open(os.path.join(workdir, 'config.conf'), 'w') as config_file:
+        config.write(config_file)
+
+
+def run_script(workdir: str, script: str) -> tuple:
+    """
+    Runs one main script to completion.
+
+    Returns:
+        tuple: (exit code, wall seconds, peak RSS in MiB, RSS_SCOPES key of what the RSS covers)
+    """
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    started = time.perf_counter()
+    with open(os.path.join(workdir, 'benchmark_stdout.txt'), 'ab') as output:
+        process = subprocess.Popen([sys.executable, script], cwd=workdir, stdout=output,
+                                   stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL)
+        if psutil is not None:
+            peak_rss, scope = wait_tree_rss(process, psutil), 'tree'
+        elif hasattr(os, 'wait4'):
+            # The usage includes the workers the script waited for, but as the largest one, not a sum
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss is KiB on Linux, bytes on macOS
+            peak_rss, scope = usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 'largest'
+        else:
+            process.wait()
+            peak_rss, scope = 0.0, 'none'
+    wall = time.perf_counter() - started
+    return process.returncode, wall, peak_rss, scope
+
+
+def wait_tree_rss(process, psutil) -> float:
+    """
+    Waits for a script and returns the peak, in MiB, of the summed RSS of the
+    script and its worker processes (shards, consoles), sampled with psutil.
+    """
+    peak = 0
+    try:
+        root = psutil.Process(process.pid)
+        while process.poll() is None:
+            total = 0
+            for member in [root, *root.children(recursive=True)]:
+                try:
+                    total += member.memory_info().rss
+                except psutil.NoSuchProcess:
+                    pass
+            peak = max(peak, total)
+            time.sleep(0.05)
+    except psutil.NoSuchProcess:
+        pass
+    process.wait()
+    return peak / (1024 * 1024)
+
+
+def run_flow(flow: str, services: int, args) -> dict:
+    """Runs one flow for one dataset size against fresh mocks."""
+    dataset = Dataset(services=services, reports=args.reports, vulns_per_asset=args.vulns_per_asset,
+                      report_seconds=args.report_seconds)
+    sc_mocks = [TenableMock(dataset, latency=args.latency, error_rate=args.error_rate).start()
+                for _ in range(max(1, args.consoles))]
+    sn_mock = ServiceNowMock(dataset, latency=args.latency, error_rate=args.error_rate).start()
+    workdir = tempfile.mkdtemp(prefix=f'bench-{flow}-{services}-')
+    try:
+        prepare_workdir(workdir)
+        write_config(workdir, sc_mocks, sn_mock, args, services)
+
+        attempts, wall, peak_rss, exit_code = 0, 0.0, 0.0, None
+        while attempts < args.attempts and exit_code != 0:
+            attempts += 1
+            exit_code, attempt_wall, attempt_rss, rss_scope = run_script(workdir, FLOWS[flow])
+            wall += attempt_wall
+            peak_rss = max(peak_rss, attempt_rss)
+
+        items = {'sync': services, 'create': min(services, args.report_assets),
+                 'download': args.reports, 'combine': 1}[flow]
+        return {
+            'flow': flow,
+            'services': services,
+            'exit_code': exit_code,
+            'attempts': attempts,
+            'wall_seconds': round(wall, 3),
+            'throughput': round(items / wall, 2) if wall else 0,
+            'peak_rss_mib': round(peak_rss, 1),
+            'rss_scope': rss_scope,
+            'requests': sum(sum(sc_mock.counts.values()) for sc_mock in sc_mocks) + sum(sn_mock.counts.values()),
+            'response_bytes': sum(sc_mock.response_bytes for sc_mock in sc_mocks) + sn_mock.response_bytes,
+            'tenablesc_requests': [dict(sorted(sc_mock.counts.items())) for sc_mock in sc_mocks],
+            'servicenow_requests': dict(sorted(sn_mock.counts.items())),
+            'workdir': workdir if args.keep else None,
+        }
+    finally:
+        for sc_mock in sc_mocks:
+            sc_mock.stop()
+        sn_mock.stop()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def print_table(results: list):
+    """Prints one summary line per flow and size."""
+    header = f'{"flow":<10}{"services":>10}{"exit":>6}{"tries":>6}{"wall s":>10}{"items/s":>10}{"requests":>10}{"RSS MiB":>9}'
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        print(f'{r["flow"]:<10}{r["services"]:>10}{r["exit_code"]:>6}{r["attempts"]:>6}{r["wall_seconds"]:>10}'
+              f'{r["throughput"]:>10}{r["requests"]:>10}{r["peak_rss_mib"]:>9}')
+    for scope in sorted({r['rss_scope'] for r in results}):
+        print(f'RSS MiB: {RSS_SCOPES[scope]}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmarks for the Tenable.sc scripts')
+    parser.add_argument('--flows', nargs='+', choices=sorted(FLOWS), default=['sync', 'create', 'download', 'combine'])
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000],
+                        help='Number of ServiceNow services per dataset (e.g. 1000 10000 100000)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every mock request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Probability of an HTTP 500 per request')
+    parser.add_argument('--attempts', type=int, default=1, help='Restart a failed run up to this many times')
+    parser.add_argument('--reports', type=int, default=50, help='Completed reports served to the downloader')
+    parser.add_argument('--report-assets', type=int, default=500, help='Assets listed under [CustomReport]')
+    parser.add_argument('--vulns-per-asset', type=int, default=20)
+    parser.add_argument('--cache-ttl', type=float, default=0, help='TenablescAPI GET cache TTL for the runs')
+    parser.add_argument('--max-workers', type=int, default=4)
+    parser.add_argument('--shards', type=int, default=1, help='Sync worker processes ([SrvNow] shards)')
+    parser.add_argument('--consoles', type=int, default=1,
+                        help='Tenable.sc mocks, each configured as a [tenable.sc:<name>] console')
+    parser.add_argument('--vuln-store', action='store_true', help='Export findings to a local store for create')
+    parser.add_argument('--track-reports', action='store_true',
+                        help='Have create launch its reports and deliver them as they complete')
+    parser.add_argument('--report-seconds', type=float, default=2, help='Run time of a launched mock report')
+    parser.add_argument('--profile', action='store_true', help='Enable [Profiling] in the generated config')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch directories (logs, .prom, .prof)')
+    parser.add_argument('--output', help='Append the JSON results to this file')
+    args = parser.parse_args()
+
+    results = []
+    for services in args.sizes:
+        for flow in args.flows:
+            print(f'Running {flow} with {services} services...', flush=True)
+            results.append(run_flow(flow, services, args))
+
+    print()
+    print_table(results)
+    if args.output:
+        with open(args.output, 'a', encoding='utf-8') as output:
+            output.write(json.dumps({'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+                                     'args': vars(args), 'results': results}) + '\n')
+
+
+if __name__ == '__main__':
+    main()
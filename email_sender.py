@@ -11,7 +11,7 @@ import time
 # Email Sender Function
 # ===================================================================
 
-def EmailSender(link, name, email_addr, reportname):
+def EmailSender(link, name, email_addr, reportname, summary=None):
     """
     Sends an email with the vulnerability report for a specific service.
     
@@ -20,6 +20,7 @@ def EmailSender(link, name, email_addr, reportname):
     name (str): Name of the service.
     email_addr (str): Recipient's email address.
     reportname (str): Name of the report file.
+    summary (str): Optional findings summary line for the service.
     """
     try:
         # Create the email message container
@@ -46,6 +47,14 @@ def EmailSender(link, name, email_addr, reportname):
         if strong_tag:
             strong_tag.string = f"{name} service"
 
+        # Fill in the findings summary, or drop its placeholder when there is none
+        summary_tag = soup.find('p', class_='summary')
+        if summary_tag:
+            if summary:
+                summary_tag.string = f"Findings summary: {summary}"
+            else:
+                summary_tag.decompose()
+
         # Attach the modified HTML content to the email
         msg.attach(MIMEText(soup.prettify(), 'html'))
 
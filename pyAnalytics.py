@@ -0,0 +1,164 @@
+"""
+-------------------------------------------------------------------------------
+Name:           pyAnalytics.py
+
+Date:           19/10/2026
+
+Last Update:    19/10/2026
+
+Purpose:        Per-asset and per-service rollups of the findings in the local
+                store ('pyVulnStore.py'): severity counts, max severity, new /
+                persisting / resolved findings and mean age, computed with
+                NumPy array operations instead of Python loops.
+
+Author:         Morteza Zeinali
+-------------------------------------------------------------------------------
+Usage:
+        import pyAnalytics
+        if pyAnalytics.available():
+            findings = pyAnalytics.load_findings(store, since)
+            per_asset = pyAnalytics.rollup(findings, period_days=7)
+            per_service = pyAnalytics.rollup(findings, period_days=7, names=asset_names)
+
+   NumPy is optional: without it available() is False and the scripts fall
+   back to the store's SQL queries (no trend summary in the emails). It is
+   only imported on first use, so importing this module (e.g. for
+   summary_text() in 'ReportDownloader.py') costs nothing.
+
+   Every finding in the input (normally those seen within the store window)
+   counts towards the severity counts, max severity and mean age
+   (lastSeen - firstSeen). The trend compares against 'period_days' ago:
+        new          first seen within the period
+        persisting   first seen before the period and still seen within it
+        resolved     not seen within the period
+-------------------------------------------------------------------------------
+"""
+
+# Import required Python modules
+import itertools
+import time
+
+# NumPy module, imported by _load_numpy() on first use
+np = None
+
+SEVERITY_NAMES = ('Info', 'Low', 'Medium', 'High', 'Critical')
+
+COLUMNS = ('asset_id', 'severity', 'first_seen', 'last_seen')
+
+
+def _load_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy as np
+        except ImportError:
+            pass
+    return np
+
+
+def available() -> bool:
+    """Returns True if NumPy is installed."""
+    return _load_numpy() is not None
+
+
+def _require_numpy():
+    if _load_numpy() is None:
+        raise RuntimeError('pyAnalytics needs NumPy; install it with "pip install numpy"')
+
+
+def load_findings(store, since: int = 0, batch: int = 100000) -> dict:
+    """
+    Loads the findings of a store into one NumPy array per column.
+
+    Args:
+        store (VulnStore): Findings store
+        since (int): Only findings last seen at or after this epoch time
+        batch (int): Rows converted per step, bounding the temporary row tuples
+
+    Returns:
+        dict: {'asset_id': int64 array, 'severity': int8 array, 'first_seen': int64 array, 'last_seen': int64 array}
+    """
+    _require_numpy()
+    dtypes = {'asset_id': np.int64, 'severity': np.int8, 'first_seen': np.int64, 'last_seen': np.int64}
+    # Tenable.sc asset ids are numeric; SQLite casts them, so each batch is read as one flat run of
+    # integers without a Python call per value, and grouping integers is far cheaper than grouping strings
+    parts = [np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64, count=len(rows) * len(COLUMNS))
+             for rows in store.iter_rows(COLUMNS, since, batch, as_integers=True)]
+    table = (np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)).reshape(-1, len(COLUMNS))
+    return {column: table[:, index].astype(dtypes[column]) for index, column in enumerate(COLUMNS)}
+
+
+def rollup(findings: dict, now: int = None, period_days: float = 7, names: dict = None) -> dict:
+    """
+    Summarises findings per asset, or per service when 'names' is given.
+
+    Args:
+        findings (dict): Column arrays from load_findings()
+        now (int): Epoch time the period is measured back from
+        period_days (float): Trend period for new / persisting / resolved
+        names (dict): Optional {asset id: service name} to group by service;
+                      assets missing from it keep their id
+
+    Returns:
+        dict: {asset id (str) or service name: {'severity_counts': {name: count}, 'max_severity': int or None,
+               'max_severity_name': str, 'findings': int, 'new': int, 'persisting': int,
+               'resolved': int, 'mean_age_days': float}}
+    """
+    _require_numpy()
+    now = now or int(time.time())
+    keys, groups = np.unique(findings['asset_id'], return_inverse=True)
+    if names is not None:
+        labels = np.array([names.get(str(key), str(key)) for key in keys.tolist()], dtype=np.str_)
+        keys, service_of = np.unique(labels, return_inverse=True)
+        groups = service_of[groups]
+    count = len(keys)
+
+    severity = np.clip(findings['severity'], 0, len(SEVERITY_NAMES) - 1).astype(np.int64)
+    first_seen = findings['first_seen']
+    last_seen = findings['last_seen']
+    cutoff = now - period_days * 86400
+
+    # One bincount per measure: group id (x5 + severity) indexes the output slot
+    counts = np.bincount(groups * len(SEVERITY_NAMES) + severity,
+                         minlength=count * len(SEVERITY_NAMES)).reshape(count, len(SEVERITY_NAMES))
+    totals = counts.sum(axis=1)
+    # Highest severity column with a non-zero count, -1 for groups without findings
+    highest = len(SEVERITY_NAMES) - 1 - np.argmax(counts[:, ::-1] > 0, axis=1)
+    max_severity = np.where(totals > 0, highest, -1)
+
+    seen_in_period = last_seen >= cutoff
+    is_new = seen_in_period & (first_seen >= cutoff)
+    new = np.bincount(groups[is_new], minlength=count)
+    persisting = np.bincount(groups[seen_in_period & ~is_new], minlength=count)
+    resolved = totals - new - persisting
+
+    age_sum = np.bincount(groups, weights=(last_seen - first_seen).astype(np.float64), minlength=count)
+    mean_age_days = age_sum / np.maximum(totals, 1) / 86400
+
+    summaries = {}
+    for i, key in enumerate(keys.tolist()):
+        summaries[str(key)] = {
+            'severity_counts': dict(zip(SEVERITY_NAMES, counts[i].tolist())),
+            'max_severity': int(max_severity[i]) if max_severity[i] >= 0 else None,
+            'max_severity_name': SEVERITY_NAMES[max_severity[i]] if max_severity[i] >= 0 else '',
+            'findings': int(totals[i]),
+            'new': int(new[i]),
+            'persisting': int(persisting[i]),
+            'resolved': int(resolved[i]),
+            'mean_age_days': round(float(mean_age_days[i]), 1),
+        }
+    return summaries
+
+
+def summary_text(summary: dict) -> str:
+    """
+    Formats one rollup summary as a single line for the report email.
+
+    Args:
+        summary (dict): One value of rollup()
+    """
+    severities = ', '.join(f'{count} {name}' for name, count in reversed(summary['severity_counts'].items())
+                           if count and name != 'Info')
+    return (f'{summary["findings"]} findings ({severities or "no Low or higher"}); '
+            f'{summary["new"]} new, {summary["persisting"]} persisting, {summary["resolved"]} resolved; '
+            f'mean age {summary["mean_age_days"]} days')
@@ -0,0 +1,267 @@
+"""
+-------------------------------------------------------------------------------
+Name:           pyConsoles.py
+
+Date:           19/10/2026
+
+Last Update:    19/10/2026
+
+Purpose:        Reads 'config.conf' once per process and runs the main scripts
+                against several Tenable.sc consoles in parallel, configured as
+                repeated [tenable.sc:<name>] sections in 'config.conf'.
+
+Author:         Morteza Zeinali
+-------------------------------------------------------------------------------
+Usage:
+        from pyConsoles import console_config, console_names, console_scriptname, \\
+            fan_out, read_config, save_state, selected_console
+        scriptname = console_scriptname(scriptname)       # '<script>.<console>'
+        config = console_config(read_config(configfile), selected_console())
+
+        consoles = console_names(config)
+        if consoles and not selected_console():
+            sys.exit(fan_out(logger, __file__, consoles, sys.argv[1:]))
+
+   With one or more [tenable.sc:<name>] sections, a main script re-runs
+   itself once per console with '--console <name>', all at the same time.
+   Each run gets its own session, rate limit, log, journal and metrics
+   (labelled instance="<name>"); the parent logs one result per console and
+   exits non-zero if any console failed.
+
+   [tenable.sc] then only holds defaults shared by the consoles: a console
+   run sees [tenable.sc] overlaid with its own section. Watermarks
+   ('last_sync', 'last_full_sync', 'last_run') and the services to retry
+   ('retry_services', 'retry_retired') are kept per console in the
+   console's section, so one console's run never skips another's changes.
+
+   read_config() parses a file only once per process: the logger options,
+   the script and, under 'tenablesc.py' or 'Scheduler_Daemon.py', every job
+   share the same ConfigParser.
+-------------------------------------------------------------------------------
+"""
+
+# Import required Python modules
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from configparser import ConfigParser
+from contextlib import contextmanager
+
+CONSOLE_SECTION = 'tenable.sc'
+
+# Options that record the progress of a run, with the section they normally live in
+CONSOLE_STATE = {
+    'last_sync': 'SrvNow',
+    'last_full_sync': 'SrvNow',
+    'retry_services': 'SrvNow',
+    'retry_retired': 'SrvNow',
+    'last_run': 'Reports',
+}
+
+
+# Parsed configuration files by real path, shared by every module of a process
+_configs = {}
+
+
+def read_config(configfile: str):
+    """
+    Returns the parsed 'config.conf', parsing it on the first call only. A
+    missing file gives an empty ConfigParser and is not remembered, so it is
+    read once it has been created.
+
+    Args:
+        configfile (str): Path to 'config.conf'
+    """
+    path = os.path.realpath(configfile)
+    config = _configs.get(path)
+    if config is None:
+        config = ConfigParser(delimiters=('=', ','))
+        if config.read(path):
+            _configs[path] = config
+    return config
+
+
+def console_names(config) -> list:
+    """
+    Returns the names of the [tenable.sc:<name>] sections in file order.
+
+    Args:
+        config (ConfigParser): Parsed 'config.conf'
+    """
+    prefix = f'{CONSOLE_SECTION}:'
+    return [section[len(prefix):] for section in config.sections() if section.startswith(prefix)]
+
+
+def selected_console() -> str:
+    """Returns the console given with '--console <name>', or '' when running unsplit."""
+    if '--console' in sys.argv:
+        return sys.argv[sys.argv.index('--console') + 1]
+    return ''
+
+
+def console_scriptname(scriptname: str) -> str:
+    """
+    Appends the selected console to a script name, so logs, journals and
+    metrics files of parallel console runs do not collide.
+    """
+    console = selected_console()
+    return f'{scriptname}.{console}' if console else scriptname
+
+
+def console_config(config, console: str):
+    """
+    Returns the configuration as seen by one console: [tenable.sc] overlaid
+    with [tenable.sc:<console>], and the console's own watermarks in place of
+    the shared ones. Returns 'config' itself when no console is selected.
+
+    Args:
+        config (ConfigParser): Parsed 'config.conf'
+        console (str): Console name, or ''
+
+    Raises:
+        ValueError: If 'config.conf' has no section for the console
+    """
+    if not console:
+        return config
+    section = f'{CONSOLE_SECTION}:{console}'
+    if not config.has_section(section):
+        raise ValueError(f'No [{section}] section in config.conf')
+
+    view = ConfigParser(delimiters=('=', ','))
+    view.read_dict({name: dict(config.items(name, raw=True)) for name in config.sections()})
+    if not view.has_section(CONSOLE_SECTION):
+        view.add_section(CONSOLE_SECTION)
+    for option, value in config.items(section, raw=True):
+        target = CONSOLE_STATE.get(option, CONSOLE_SECTION)
+        if not view.has_section(target):
+            view.add_section(target)
+        view.set(target, option, value)
+    return view
+
+
+@contextmanager
+def _config_lock(configfile: str, timeout: float = 30):
+    """Serializes writers of 'config.conf' across threads and processes with a lock file."""
+    lock_path = f'{configfile}.lock'
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            # A lock older than the timeout was left behind by a killed process
+            try:
+                if time.time() - os.path.getmtime(lock_path) > timeout:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f'Timed out waiting for {lock_path}')
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.remove(lock_path)
+
+
+def _set_options(lines: list, section: str, values: dict) -> list:
+    """Sets options of one section in the lines of an INI file, keeping comments and order."""
+    pending = {option.lower(): value for option, value in values.items()}
+    header = f'[{section}]'
+    start = next((i for i, line in enumerate(lines) if line.strip() == header), None)
+    if start is None:
+        if lines and lines[-1].strip():
+            lines.append('\n')
+        lines.append(f'{header}\n')
+        end = len(lines)
+    else:
+        end = start + 1
+        while end < len(lines) and not lines[end].lstrip().startswith('['):
+            end += 1
+        for i in range(start + 1, end):
+            line = lines[i].strip()
+            if not line or line.startswith(('#', ';')):
+                continue
+            key = line.replace(',', '=').split('=', 1)[0].strip().lower()
+            if key in pending:
+                lines[i] = f'{key} = {pending.pop(key)}\n'
+        # New options go after the last non-blank line of the section
+        while end > start + 1 and not lines[end - 1].strip():
+            end -= 1
+    for option, value in pending.items():
+        lines.insert(end, f'{option} = {value}\n')
+        end += 1
+    return lines
+
+
+def save_state(config, configfile: str, section: str, values: dict):
+    """
+    Persists run progress (e.g. a watermark) to 'config.conf'. Only the
+    given options are rewritten, under a lock, so parallel runs and the
+    comments in the file are left intact. In a console run the watermarks
+    go to the console's own section.
+
+    Args:
+        config (ConfigParser): The in-memory configuration, updated as well
+        configfile (str): Path to 'config.conf'
+        section (str): Section the options belong to, e.g. 'SrvNow'
+        values (dict): {option: value}
+    """
+    for option, value in values.items():
+        config.set(section, option, value)
+
+    target = section
+    console = selected_console()
+    if console and all(CONSOLE_STATE.get(option.lower()) == section for option in values):
+        target = f'{CONSOLE_SECTION}:{console}'
+
+    with _config_lock(configfile):
+        with open(configfile, encoding='utf-8') as config_read:
+            lines = config_read.readlines()
+        lines = _set_options(lines, target, values)
+        tmp_path = f'{configfile}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as config_write:
+            config_write.writelines(lines)
+        os.replace(tmp_path, configfile)
+
+
+def fan_out(logger, script: str, consoles: list, args: list = ()) -> int:
+    """
+    Runs a main script once per console, in parallel, and logs the result of each.
+
+    Args:
+        logger (logging.Logger): Logger of the calling script or scheduler
+        script (str): Path of the main script to run
+        consoles (list): Console names from console_names()
+        args (list): Extra command line arguments, e.g. ['--profile']
+
+    Returns:
+        int: 0 if every console succeeded, otherwise 1
+    """
+    scriptname = os.path.splitext(os.path.basename(script))[0]
+
+    def run_console(console):
+        started = time.perf_counter()
+        # No console input: parallel runs cannot share interactive prompts
+        completed = subprocess.run([sys.executable, script, *args, '--console', console],
+                                   cwd=os.path.dirname(os.path.abspath(script)), stdin=subprocess.DEVNULL)
+        return console, completed.returncode, time.perf_counter() - started
+
+    logger.info(f'Running {scriptname} on {len(consoles)} consoles: {", ".join(consoles)}')
+    with ThreadPoolExecutor(max_workers=len(consoles)) as executor:
+        results = list(executor.map(run_console, consoles))
+
+    failed = 0
+    for console, returncode, seconds in results:
+        if returncode == 0:
+            logger.info(f'Console {console}: succeeded in {seconds:.1f}s (log: {scriptname}.{console}.log)')
+        else:
+            failed += 1
+            logger.error(f'Console {console}: failed with exit code {returncode} after {seconds:.1f}s '
+                         f'(log: {scriptname}.{console}.log)')
+    logger.info(f'{len(consoles) - failed} of {len(consoles)} consoles succeeded')
+    return 1 if failed else 0
@@ -0,0 +1,147 @@
+"""
+-------------------------------------------------------------------------------
+Name:           pyJournal.py
+
+Date:           19/10/2026
+
+Last Update:    19/10/2026
+
+Purpose:        Crash-safe write-ahead journal of planned and completed
+                operations, so an interrupted run resumes where it stopped.
+
+Author:         Morteza Zeinali
+-------------------------------------------------------------------------------
+Usage:
+        from pyJournal import SyncJournal
+        journal = SyncJournal(scriptloc + scriptname + '.journal', max_age=12 * 3600, window=watermark)
+        if not journal.is_done(op):
+            journal.planned(op)
+            ...apply the operation...
+            journal.done(op)
+        journal.complete()     # once every operation of the run was attempted
+
+   The journal file is one JSON object per line. It is fsync'ed once per
+   operation, when the operation is marked 'done'; 'planned' records are
+   only flushed, as losing one merely re-applies an operation that was never
+   confirmed. While the file holds an unfinished run, the next run reuses
+   that run id and skips every operation already marked 'done', unless that
+   run started more than 'max_age' seconds ago or covered another 'window'
+   (e.g. an older sync watermark); then it starts a new run.
+
+   A run is complete once every operation was attempted, failed ones
+   included: those are retried by the script itself (e.g. 'retry_services'
+   in [SrvNow]), not by keeping the run open. Operations should name their
+   content (e.g. a hash of the IPs to write), so a resumed run does not skip
+   a change made after the interrupted one.
+-------------------------------------------------------------------------------
+"""
+
+# Import required Python modules
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+
+
+class SyncJournal:
+    """
+    A write-ahead journal for one script, keyed by run id.
+    """
+
+    def __init__(self, path: str, max_age: float = 0, window: str = ''):
+        """
+        Opens the journal, resuming an unfinished run if one is recorded for
+        the same window and no older than max_age.
+
+        Args:
+            path (str): Journal file path, normally next to the script's log
+            max_age (float): Seconds an unfinished run stays resumable; 0 for no limit
+            window (str): What the run covers, e.g. the watermark it starts from
+        """
+        self.path = path
+        self.run_id = None
+        self.resumed = False
+        # Unfinished run that was too old or for another window, for the log
+        self.expired = None
+        self._started = 0
+        self._window = ''
+        self._done = set()
+        self._planned = set()
+
+        if os.path.exists(path):
+            self._load()
+
+        if self.run_id is not None and (self._window != window or
+                                        (max_age and time.time() - self._started > max_age)):
+            self.expired = self.run_id
+            self.run_id = None
+            self._done.clear()
+            self._planned.clear()
+
+        if self.run_id is None:
+            self.run_id = f'{datetime.now().strftime("%Y%m%d%H%M%S")}-{uuid.uuid4().hex[:8]}'
+            self._file = open(path, 'w', encoding='utf-8')
+            self._write({'event': 'start', 'run_id': self.run_id, 'started': int(time.time()), 'window': window})
+        else:
+            self.resumed = True
+            self._file = open(path, 'a', encoding='utf-8')
+            self._write({'event': 'resume', 'run_id': self.run_id})
+
+    def _load(self):
+        """Reads an existing journal; a truncated last line from a crash is ignored."""
+        with open(self.path, 'r', encoding='utf-8') as journal_file:
+            for line in journal_file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                event = record.get('event')
+                if event == 'start':
+                    self.run_id = record['run_id']
+                    # Journals written before these fields count as expired once max_age is set
+                    self._started = record.get('started', 0)
+                    self._window = record.get('window', '')
+                elif event == 'planned':
+                    self._planned.add(record['op'])
+                elif event == 'done':
+                    self._done.add(record['op'])
+                elif event == 'complete':
+                    self.run_id = None
+                    self._done.clear()
+                    self._planned.clear()
+
+    def _write(self, record: dict, sync: bool = True):
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+
+    @property
+    def pending(self) -> set:
+        """Operations planned by an earlier attempt but never completed."""
+        return self._planned - self._done
+
+    def is_done(self, op: str) -> bool:
+        """Returns True if the operation was already applied in this run."""
+        return op in self._done
+
+    def planned(self, op: str):
+        """Records the intent to apply an operation, before it is sent."""
+        self._planned.add(op)
+        self._write({'event': 'planned', 'op': op}, sync=False)
+
+    def done(self, op: str):
+        """Records that an operation was applied successfully."""
+        self._done.add(op)
+        self._write({'event': 'done', 'op': op})
+
+    def complete(self):
+        """Marks the run finished, once every operation was attempted; the next run starts with a new run id."""
+        self._write({'event': 'complete', 'run_id': self.run_id})
+        self.close()
+
+    def close(self):
+        """Closes the journal file without finishing the run."""
+        if not self._file.closed:
+            self._file.close()
@@ -1,7 +1,7 @@
 #-------------------------------------------------------------------------------
 # Name:         pyLogger.py
 # Purpose:      Configures logging for scripts to a log file
-#               
+#
 #
 #-------------------------------------------------------------------------------
 
@@ -17,11 +17,90 @@
 #        from pyLogging import Logger
 #        loginstance = Logger(scriptname)
 #        logger = loginstance.setup()
+#
+#    Optional settings come from the [Logging] section of 'config.conf':
+#        logger = loginstance.setup(**logging_options(configfile))
+#
+#        queued = true        format and write log lines on a background thread
+#        json = true          write one JSON object per line instead of plain text
+#        sample_every = 100   keep 1 in N high-volume per-asset messages, i.e.
+#                             those logged with extra=SAMPLED, and log how many
+#                             were suppressed when the handlers are closed
 
 # Import logging and logging.handlers modules (embedded into Python)
 
+import copy
+import json
 import logging
 import logging.handlers
+import queue
+from configparser import ConfigParser
+
+# Pass as 'extra' to mark a high-volume per-asset message as subject to sampling
+SAMPLED = {'sampled': True}
+
+
+def logging_options(config):
+    """Read the optional [Logging] settings for Logger.setup() from 'config.conf' (its path or the parsed ConfigParser)"""
+    if isinstance(config, str):
+        configfile = config
+        config = ConfigParser(delimiters=('=', ','))
+        config.read(configfile)
+    return {
+        'queued': config.getboolean('Logging', 'queued', fallback=False),
+        'json_format': config.getboolean('Logging', 'json', fallback=False),
+        'sample_every': config.getint('Logging', 'sample_every', fallback=1),
+    }
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as a single JSON line"""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'name': record.name,
+            'level': record.levelname,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Enqueues a picklable copy of the record, leaving line formatting to the listener"""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """Lets through 1 in every N records marked with extra=SAMPLED and counts the rest"""
+
+    def __init__(self, every):
+        super().__init__()
+        self.every = max(1, every)
+        self.seen = 0
+        self.suppressed = 0
+
+    def filter(self, record):
+        if not getattr(record, 'sampled', False) or record.levelno > logging.INFO:
+            return True
+        self.seen += 1
+        if (self.seen - 1) % self.every == 0:
+            return True
+        self.suppressed += 1
+        return False
 
 
 class Logger(object):
@@ -31,12 +110,19 @@ class Logger(object):
         self._scriptname = filename
         self._fh = None
         self._ch = None
+        self._qh = None
+        self._listener = None
+        self._sampler = None
+        self._options = {}
+        self._closed = True
         # Configure debug logging
         # create logger with '__main__'
         self._logger = logging.getLogger(filename)
         self._logger.setLevel(logging.DEBUG)
 
-    def setup(self):
+    def setup(self, queued=False, json_format=False, sample_every=1):
+        self._options = {'queued': queued, 'json_format': json_format, 'sample_every': sample_every}
+        self._closed = False
         # create rotating filehandler which logs messages to file
         self._fh = logging.handlers.RotatingFileHandler(
             self._scriptloc + self._scriptname + '.log', maxBytes=500000, backupCount=5)
@@ -45,17 +131,55 @@ class Logger(object):
         self._ch = logging.StreamHandler()
         self._ch.setLevel(logging.DEBUG)
         # create formatter and add it to the handlers
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        if json_format:
+            formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
         self._fh.setFormatter(formatter)
         self._ch.setFormatter(formatter)
-        # add the handlers to the logger
-        self._logger.addHandler(self._fh)
-        self._logger.addHandler(self._ch)
+        # sample high-volume per-asset messages before they reach any handler
+        if sample_every > 1:
+            self._sampler = SamplingFilter(sample_every)
+            self._logger.addFilter(self._sampler)
+        if queued:
+            # the calling thread only enqueues; a listener thread formats and writes
+            log_queue = queue.SimpleQueue()
+            self._qh = _QueueHandler(log_queue)
+            self._listener = logging.handlers.QueueListener(
+                log_queue, self._fh, self._ch, respect_handler_level=True)
+            self._listener.start()
+            self._logger.addHandler(self._qh)
+        else:
+            # add the handlers to the logger
+            self._logger.addHandler(self._fh)
+            self._logger.addHandler(self._ch)
         return self._logger
 
     def closeHandlers(self):
+        if self._sampler is not None and self._sampler.suppressed:
+            self._logger.info(f'Suppressed {self._sampler.suppressed} of {self._sampler.seen} '
+                              f'sampled messages (sample_every={self._sampler.every})')
+        if self._listener is not None:
+            # stop() drains every queued record before the handlers close
+            self._listener.stop()
+            self._logger.removeHandler(self._qh)
+            self._qh.close()
+        else:
+            self._logger.removeHandler(self._fh)
+            self._logger.removeHandler(self._ch)
+        if self._sampler is not None:
+            self._logger.removeFilter(self._sampler)
         self._fh.close()
         self._ch.close()
-    
-    
+        self._listener = None
+        self._sampler = None
+        self._closed = True
+
+    def reopen(self):
+        # long-running callers re-attach handlers after a script's exit handler closed them
+        if self._closed:
+            self.setup(**self._options)
+        return self._logger
+
+
@@ -0,0 +1,249 @@
+"""
+-------------------------------------------------------------------------------
+Name:           pyMetrics.py
+
+Date:           19/10/2026
+
+Last Update:    19/10/2026
+
+Purpose:        Per-endpoint request metrics for the Tenable.sc and ServiceNow
+                API clients: request counts, latency histograms, response bytes
+                and errors. Exported as a Prometheus textfile and as a
+                JSON summary for the script log.
+
+Author:         Morteza Zeinali
+-------------------------------------------------------------------------------
+Usage:
+        from pyMetrics import export_metrics, textfile_path
+        export_metrics(logger, [sc.metrics, sn.metrics], textfile_path(config, scriptname))
+
+   Endpoints are reduced to templates ('asset/123?fields=id' -> 'asset/{id}')
+   so per-object calls aggregate into one series. Every series carries a
+   'script' label, the name of its '.prom' file, as the textfile collector
+   rejects a series exported by two files.
+-------------------------------------------------------------------------------
+"""
+
+# Import required Python modules
+import json
+import os
+import re
+import threading
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_ID_SEGMENT = re.compile(r'^\d+$')
+
+
+def endpoint_template(endpoint: str) -> str:
+    """
+    Reduces an endpoint to its template by dropping the query string and
+    replacing numeric path segments with '{id}'.
+
+    Args:
+        endpoint (str): Endpoint as passed to HTTPRequest
+
+    Returns:
+        str: Endpoint template, e.g. 'report/{id}/download'
+    """
+    path = endpoint.split('?', 1)[0]
+    return '/'.join('{id}' if _ID_SEGMENT.match(part) else part for part in path.split('/'))
+
+
+class _EndpointStats:
+    """Counters and latency histogram for one method + endpoint template."""
+    __slots__ = ('requests', 'errors', 'response_bytes', 'latency_sum', 'buckets')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.response_bytes = 0
+        self.latency_sum = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+
+
+class RequestMetrics:
+    """
+    Thread-safe request metrics for one API client.
+    """
+
+    def __init__(self, client: str, instance: str = '', shard: str = ''):
+        """
+        Args:
+            client (str): Client label, e.g. 'tenablesc' or 'servicenow'
+            instance (str): Optional instance label, e.g. a console name
+            shard (str): Optional shard label of a sync worker process
+        """
+        self.client = client
+        self.instance = instance
+        self.shard = shard
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # picklable, so worker processes can hand their metrics back to the parent
+        with self._lock:
+            return {'client': self.client, 'instance': self.instance, 'shard': self.shard,
+                    '_stats': dict(self._stats)}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _get(self, method: str, endpoint: str) -> _EndpointStats:
+        key = (method, endpoint_template(endpoint))
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = _EndpointStats()
+        return stats
+
+    def record(self, method: str, endpoint: str, seconds: float, response_bytes: int = 0, error: bool = False):
+        """
+        Records one completed (or failed) request.
+
+        Args:
+            method (str): HTTP method
+            endpoint (str): Endpoint as passed to HTTPRequest
+            seconds (float): Wall time of the request
+            response_bytes (int): Size of the response body
+            error (bool): True if the request failed or returned a non-200 status
+        """
+        with self._lock:
+            stats = self._get(method, endpoint)
+            stats.requests += 1
+            stats.response_bytes += response_bytes
+            stats.latency_sum += seconds
+            if error:
+                stats.errors += 1
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    stats.buckets[i] += 1
+                    break
+
+    def reset(self):
+        """Drops all recorded metrics."""
+        with self._lock:
+            self._stats.clear()
+
+    def summary(self) -> dict:
+        """
+        Returns a JSON-serialisable summary keyed by 'METHOD endpoint'.
+        """
+        with self._lock:
+            endpoints = {}
+            for (method, endpoint), stats in sorted(self._stats.items()):
+                endpoints[f'{method} {endpoint}'] = {
+                    'requests': stats.requests,
+                    'errors': stats.errors,
+                    'response_bytes': stats.response_bytes,
+                    'latency_total': round(stats.latency_sum, 3),
+                    'latency_avg': round(stats.latency_sum / stats.requests, 3) if stats.requests else 0,
+                }
+        summary = {'client': self.client, 'endpoints': endpoints}
+        if self.instance:
+            summary['instance'] = self.instance
+        if self.shard:
+            summary['shard'] = self.shard
+        return summary
+
+    def prometheus_lines(self, script: str = '') -> list:
+        """
+        Returns the metrics as Prometheus text exposition sample lines.
+
+        Args:
+            script (str): Optional script label, e.g. the name of the '.prom' file
+        """
+        lines = []
+        with self._lock:
+            for (method, endpoint), stats in sorted(self._stats.items()):
+                labels = f'client="{self.client}",method="{method}",endpoint="{endpoint}"'
+                if script:
+                    labels = f'script="{script}",' + labels
+                if self.instance:
+                    labels += f',instance="{self.instance}"'
+                if self.shard:
+                    labels += f',shard="{self.shard}"'
+                lines.append(f'http_client_requests_total{{{labels}}} {stats.requests}')
+                lines.append(f'http_client_errors_total{{{labels}}} {stats.errors}')
+                lines.append(f'http_client_response_bytes_total{{{labels}}} {stats.response_bytes}')
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                    cumulative += count
+                    lines.append(f'http_client_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'http_client_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.requests}')
+                lines.append(f'http_client_request_duration_seconds_sum{{{labels}}} {stats.latency_sum:.6f}')
+                lines.append(f'http_client_request_duration_seconds_count{{{labels}}} {stats.requests}')
+        return lines
+
+
+_PROMETHEUS_HEADER = [
+    '# HELP http_client_requests_total API requests sent, by method and endpoint template.',
+    '# TYPE http_client_requests_total counter',
+    '# HELP http_client_errors_total API requests that failed or returned a non-200 status.',
+    '# TYPE http_client_errors_total counter',
+    '# HELP http_client_response_bytes_total Response body bytes received.',
+    '# TYPE http_client_response_bytes_total counter',
+    '# HELP http_client_request_duration_seconds API request latency.',
+    '# TYPE http_client_request_duration_seconds histogram',
+]
+
+
+def write_prometheus(path: str, metrics_list: list):
+    """
+    Writes metrics to a Prometheus textfile-collector file, labelled with the
+    file name as 'script'. The file is written to a temporary name and renamed
+    so scrapes never see a partial file.
+
+    Args:
+        path (str): Target '.prom' file
+        metrics_list (list): RequestMetrics instances to export
+    """
+    script = os.path.splitext(os.path.basename(path))[0]
+    lines = list(_PROMETHEUS_HEADER)
+    for metrics in metrics_list:
+        lines.extend(metrics.prometheus_lines(script))
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as prom_file:
+        prom_file.write('\n'.join(lines) + '\n')
+    os.replace(tmp_path, path)
+
+
+def textfile_path(config, scriptname: str):
+    """
+    Returns the Prometheus textfile path for a script, from the optional
+    'textfile_dir' option of the [Metrics] section, or None when unset.
+
+    Args:
+        config (ConfigParser): Parsed 'config.conf' (may be None)
+        scriptname (str): Calling script name, used as the file name
+
+    Returns:
+        str: '<textfile_dir>/<scriptname>.prom', or None
+    """
+    if config is None:
+        return None
+    textfile_dir = config.get('Metrics', 'textfile_dir', fallback='')
+    return os.path.join(textfile_dir, f'{scriptname}.prom') if textfile_dir else None
+
+
+def export_metrics(logger, metrics_list: list, textfile: str = None):
+    """
+    Logs a JSON summary of every client's metrics and optionally writes the
+    Prometheus textfile. Export failures are logged, never raised, so they
+    cannot mask the script's own exit status.
+
+    Args:
+        logger (logging.Logger): Script logger
+        metrics_list (list): RequestMetrics instances (None entries are skipped)
+        textfile (str): Optional '.prom' file path
+    """
+    metrics_list = [metrics for metrics in metrics_list if metrics is not None]
+    try:
+        for metrics in metrics_list:
+            logger.info(f'Request metrics: {json.dumps(metrics.summary())}')
+        if textfile:
+            write_prometheus(textfile, metrics_list)
+            logger.info(f'Request metrics written to: {textfile}')
+    except Exception as e:
+        logger.warning(f'Failed to export request metrics: {e}')
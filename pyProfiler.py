@@ -0,0 +1,144 @@
+"""
+-------------------------------------------------------------------------------
+Name:           pyProfiler.py
+
+Date:           19/10/2026
+
+Last Update:    19/10/2026
+
+Purpose:        Named phase timers for the main scripts, plus an opt-in
+                profiling mode that captures cProfile and tracemalloc output
+                next to the script's log file.
+
+Author:         Morteza Zeinali
+-------------------------------------------------------------------------------
+Usage:
+        from pyProfiler import Profiler, profiling_requested
+        profiler = Profiler(logger, scriptloc + scriptname)
+        profiler.start(profiling_requested(config))
+        with profiler.phase('login'):
+            sc.LoginTenable()
+        profiler.stop()        # logs phase totals, writes profile files
+
+   Profiling is enabled by passing '--profile' on the command line or with
+   'enabled = true' in the [Profiling] section of 'config.conf'. It writes:
+        <script>.prof          cProfile stats (open with pstats / snakeviz)
+        <script>.profile.txt   top functions by cumulative time
+        <script>.memory.txt    peak memory and top allocation sites
+
+   Phase timers are always on and cost next to nothing. Phases may be
+   entered many times (e.g. once per service) and may nest; each phase
+   reports its own total time and number of entries.
+-------------------------------------------------------------------------------
+"""
+
+# Import required Python modules
+import cProfile
+import io
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+def profiling_requested(config=None) -> bool:
+    """
+    Returns True if profiling was requested with '--profile' or in 'config.conf'.
+
+    Args:
+        config (ConfigParser): Parsed 'config.conf' (may be None)
+    """
+    if '--profile' in sys.argv:
+        return True
+    return config is not None and config.getboolean('Profiling', 'enabled', fallback=False)
+
+
+class Profiler:
+    """
+    Phase timers with optional cProfile / tracemalloc capture for one script.
+    """
+
+    def __init__(self, logger, path_prefix: str):
+        """
+        Args:
+            logger (logging.Logger): Script logger the phase summary is written to
+            path_prefix (str): Log path without extension, e.g. scriptloc + scriptname
+        """
+        self.logger = logger
+        self.path_prefix = path_prefix
+        self.enabled = False
+        self._phases = {}
+        self._order = []
+        self._started = time.perf_counter()
+        self._profile = None
+
+    def start(self, enabled: bool = False):
+        """
+        Restarts the wall clock and, if enabled, begins cProfile and tracemalloc capture.
+
+        Args:
+            enabled (bool): Capture cProfile and tracemalloc output
+        """
+        self._started = time.perf_counter()
+        self.enabled = enabled
+        if enabled:
+            self.logger.info(f'Profiling enabled, output: {self.path_prefix}.prof / .memory.txt')
+            tracemalloc.start(10)
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Times one entry into a named phase.
+
+        Args:
+            name (str): Phase name, e.g. 'login' or 'servicenow fetch'
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if name not in self._phases:
+                self._phases[name] = [0.0, 0]
+                self._order.append(name)
+            self._phases[name][0] += elapsed
+            self._phases[name][1] += 1
+
+    def summary(self) -> dict:
+        """Returns {phase: (total seconds, entries)} in first-entered order."""
+        return {name: tuple(self._phases[name]) for name in self._order}
+
+    def stop(self):
+        """
+        Logs the phase totals and, when profiling, writes the profile files.
+        Failures are logged, never raised, so they cannot mask the exit status.
+        """
+        wall = time.perf_counter() - self._started
+        for name, (total, count) in self.summary().items():
+            self.logger.info(f'Phase {name}: {total:.3f}s over {count} run(s)')
+        self.logger.info(f'Total wall time: {wall:.3f}s')
+
+        if not self.enabled:
+            return
+        self.enabled = False
+        try:
+            self._profile.disable()
+            self._profile.dump_stats(f'{self.path_prefix}.prof')
+            stream = io.StringIO()
+            pstats.Stats(self._profile, stream=stream).sort_stats('cumulative').print_stats(40)
+            with open(f'{self.path_prefix}.profile.txt', 'w', encoding='utf-8') as profile_file:
+                profile_file.write(stream.getvalue())
+
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            with open(f'{self.path_prefix}.memory.txt', 'w', encoding='utf-8') as memory_file:
+                memory_file.write(f'Current: {current / 1024 / 1024:.1f} MiB, Peak: {peak / 1024 / 1024:.1f} MiB\n\n')
+                for stat in snapshot.statistics('lineno')[:25]:
+                    memory_file.write(f'{stat}\n')
+            self.logger.info(f'Profile written to: {self.path_prefix}.prof')
+        except Exception as e:
+            self.logger.warning(f'Failed to write profiling output: {e}')
@@ -0,0 +1,196 @@
+"""
+-------------------------------------------------------------------------------
+Name:           pyRecords.py
+
+Date:           19/10/2026
+
+Last Update:    19/10/2026
+
+Purpose:        Compact record types for Tenable.sc assets, reports and
+                vulnerability findings, plus an in-memory asset index.
+
+Author:         Morteza Zeinali
+-------------------------------------------------------------------------------
+Notes:
+   1. Records use '__slots__' so no per-instance '__dict__' is allocated;
+      100k assets or findings cost a fraction of the equivalent JSON dicts.
+   2. Strings that repeat across rows (severity names, tags, asset types,
+      report status, protocols, plugin names) are interned so every record
+      shares a single copy.
+-------------------------------------------------------------------------------
+"""
+
+# Import required Python modules
+import sys
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+def _intern(value) -> str:
+    """Return an interned string for a repeated JSON value ('' for None)."""
+    return sys.intern(str(value)) if value is not None else ''
+
+
+# ===================================================================
+# Record Types
+# ===================================================================
+
+@dataclass
+class Asset:
+    """A Tenable.sc asset as returned by the 'asset' endpoint."""
+    __slots__ = ('id', 'name', 'type', 'tags', 'defined_ips')
+
+    id: str
+    name: str
+    type: str
+    tags: str
+    defined_ips: str
+
+    @classmethod
+    def from_json(cls, item: dict) -> 'Asset':
+        """
+        Build an Asset from one entry of the 'usable' / 'manageable' list.
+
+        Args:
+            item (dict): Decoded JSON object for a single asset
+
+        Returns:
+            Asset: Compact asset record
+        """
+        return cls(
+            id=str(item['id']),
+            name=item.get('name', ''),
+            type=_intern(item.get('type')),
+            tags=_intern(item.get('tags')),
+            defined_ips=item.get('definedIPs', '') or '',
+        )
+
+
+@dataclass
+class Report:
+    """A Tenable.sc report result as returned by the 'report' endpoint."""
+    __slots__ = ('id', 'name', 'type', 'status', 'finish_time')
+
+    id: str
+    name: str
+    type: str
+    status: str
+    finish_time: int
+
+    @classmethod
+    def from_json(cls, item: dict) -> 'Report':
+        """
+        Build a Report from one entry of the 'usable' list.
+
+        Args:
+            item (dict): Decoded JSON object for a single report result
+
+        Returns:
+            Report: Compact report record
+        """
+        return cls(
+            id=str(item['id']),
+            name=item.get('name', ''),
+            type=_intern(item.get('type')),
+            status=_intern(item.get('status')),
+            finish_time=int(item.get('finishTime') or 0),
+        )
+
+
+@dataclass
+class Finding:
+    """A single 'vulndetails' row from the 'analysis' endpoint."""
+    __slots__ = ('asset_id', 'plugin_id', 'plugin_name', 'ip', 'port', 'protocol',
+                 'severity', 'severity_name', 'first_seen', 'last_seen')
+
+    asset_id: str
+    plugin_id: int
+    plugin_name: str
+    ip: str
+    port: int
+    protocol: str
+    severity: int
+    severity_name: str
+    first_seen: int
+    last_seen: int
+
+    @classmethod
+    def from_json(cls, item: dict, asset_id: str = '') -> 'Finding':
+        """
+        Build a Finding from one entry of the analysis 'results' list.
+
+        Args:
+            item (dict): Decoded JSON object for a single vulnerability row
+            asset_id (str): Id of the asset the query was filtered on, if any
+
+        Returns:
+            Finding: Compact finding record
+        """
+        severity = item.get('severity') or {}
+        return cls(
+            asset_id=str(asset_id),
+            plugin_id=int(item.get('pluginID') or 0),
+            plugin_name=_intern(item.get('pluginName')),
+            ip=item.get('ip', ''),
+            port=int(item.get('port') or 0),
+            protocol=_intern(item.get('protocol')),
+            severity=int(severity.get('id') or 0),
+            severity_name=_intern(severity.get('name')),
+            first_seen=int(item.get('firstSeen') or 0),
+            last_seen=int(item.get('lastSeen') or 0),
+        )
+
+
+# ===================================================================
+# Asset Index
+# ===================================================================
+
+class AssetIndex:
+    """
+    An id-keyed snapshot of Tenable.sc assets, with a lookup by name.
+
+    Tenable.sc does not enforce unique asset names, so find() returns every
+    asset with a name, as the per-call 'GET asset' scans did. Scripts build
+    one index per run instead of re-listing every asset for each lookup, and
+    keep it current with add() / remove() as they write.
+    """
+
+    def __init__(self, assets: Iterable[Asset] = ()):
+        self._by_id: Dict[str, Asset] = {}
+        self._ids_by_name: Dict[str, List[str]] = {}
+        for asset in assets:
+            self.add(asset)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[Asset]:
+        return iter(list(self._by_id.values()))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids_by_name
+
+    def find(self, name: str) -> List[Asset]:
+        """Return every asset with the given name, in listing order."""
+        return [self._by_id[asset_id] for asset_id in self._ids_by_name.get(name, ())]
+
+    def add(self, asset: Asset):
+        """Insert or replace an asset in the index."""
+        if asset.id in self._by_id:
+            self.remove(asset.id)
+        self._by_id[asset.id] = asset
+        self._ids_by_name.setdefault(asset.name, []).append(asset.id)
+
+    def remove(self, asset_id: str) -> Optional[Asset]:
+        """Drop an asset from the index by id and return it, if present."""
+        asset = self._by_id.pop(asset_id, None)
+        if asset is not None:
+            ids = self._ids_by_name[asset.name]
+            ids.remove(asset_id)
+            if not ids:
+                del self._ids_by_name[asset.name]
+        return asset
+
+    def names(self) -> List[str]:
+        """Return the distinct names of all indexed assets."""
+        return list(self._ids_by_name)
@@ -0,0 +1,289 @@
+"""
+-------------------------------------------------------------------------------
+Name:           pyReportJobs.py
+
+Date:           19/10/2026
+
+Last Update:    19/10/2026
+
+Purpose:        Tracks the report runs launched by 'ReportCreator.py' and
+                delivers each report (download, save, email) as soon as it
+                completes, instead of leaving it to the next run of
+                'ReportDownloader.py'.
+
+Author:         Morteza Zeinali
+-------------------------------------------------------------------------------
+Usage:
+        from pyReportJobs import ReportTracker, deliver_report
+        tracker = ReportTracker(sc, logger, poll_interval=5, max_poll_interval=120, timeout=3600)
+        tracker.start(lambda report: deliver_report(sc, report, sharepoint_path, recipients))
+        tracker.launch(definition_id, name)     # once per created report definition
+        result = tracker.wait()                 # {'delivered', 'failed', 'pending'}
+
+   All outstanding runs are checked with one 'report' listing request per
+   poll, however many there are. Polls start 'poll_interval' seconds apart
+   and the wait doubles, up to 'max_poll_interval', while nothing finishes;
+   it drops back once a report completes. Completed reports are delivered
+   on worker threads while polling goes on.
+
+   A report counts as delivered once its file exists in SharePoint, so
+   'ReportDownloader.py' skips the reports the tracker delivered, and picks
+   up the ones still running when the tracker timed out. While a report is
+   being delivered, a '<file>.delivering' claim created with O_EXCL keeps
+   any other run (e.g. 'ReportDownloader.py' under 'Scheduler_Daemon.py')
+   from downloading and emailing it at the same time.
+-------------------------------------------------------------------------------
+"""
+
+# Import required Python modules
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from pyAnalytics import summary_text
+from pyLogger import SAMPLED
+
+COMPLETED_STATUS = 'Completed'
+
+# Report result states that will never complete
+FAILED_STATUSES = ('Error', 'Stopped')
+
+# Seconds after which a delivery claim counts as left behind by a crashed run
+CLAIM_TIMEOUT = 3600
+
+
+def report_filename(report) -> str:
+    """Returns '<report name>-<finished YYYY-mm-dd-HH.MM>.<type>' for a report result."""
+    formatted_time = time.strftime("%Y-%m-%d-%H.%M", time.localtime(report.finish_time))
+    return f'{report.name}-{formatted_time}.{report.type}'
+
+
+def claim_delivery(path: str) -> bool:
+    """
+    Claims the delivery of a report file by creating '<path>.delivering'
+    atomically. A claim older than CLAIM_TIMEOUT is taken over.
+
+    Args:
+        path (str): Path of the report file
+
+    Returns:
+        bool: True if this run may deliver the report, False if another run is delivering it
+    """
+    claim = f'{path}.delivering'
+    for _ in range(2):
+        try:
+            os.close(os.open(claim, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(claim) < CLAIM_TIMEOUT:
+                    return False
+                os.remove(claim)
+            except FileNotFoundError:
+                pass
+    return False
+
+
+def deliver_report(sc, report, sharepoint_path: str, recipients: dict, store=None, phase=None):
+    """
+    Downloads a completed report to '<sharepoint_path>/<report name>/' and
+    emails it to the recipients of its service. A report whose file already
+    exists has been delivered before and is skipped, as is one another run
+    is delivering.
+
+    Args:
+        sc (TenablescAPI): Logged-in Tenable.sc client
+        report (Report): Completed report result
+        sharepoint_path (str): Report destination, [Reports] SharePoint_path
+        recipients (dict): {service name: email address}, the [Emails] section
+        store (VulnStore): Optional findings store holding the service summaries
+        phase (callable): Optional phase timer, e.g. profiler.phase
+
+    Returns:
+        str: Path of the saved report, or None if it was already delivered or is being delivered
+    """
+    phase = phase or (lambda name: nullcontext())
+    filename = report_filename(report)
+    folder = os.path.join(sharepoint_path, report.name)
+    path = os.path.join(folder, filename)
+    if os.path.exists(path):
+        return None
+
+    os.makedirs(folder, exist_ok=True)
+    if not claim_delivery(path):
+        return None
+    try:
+        # Delivered by a run that released its claim between the check above and ours
+        if os.path.exists(path):
+            return None
+
+        with phase('download'):
+            response = sc.HTTPRequest('POST', f'report/{report.id}/download', data={'id': int(report.id)})
+        # Written under a temporary name of its own, so a half-written file never counts as delivered
+        # and console runs saving to the same SharePoint folder do not collide
+        with phase('save'):
+            with tempfile.NamedTemporaryFile(dir=folder, prefix=f'{filename}.', suffix='.part', delete=False) as report_file:
+                report_file.write(response.content)
+            os.replace(report_file.name, path)
+
+        with phase('email'):
+            for service_name, recipient in recipients.items():
+                if service_name.upper() == report.name.upper():
+                    # Imported here: it loads BeautifulSoup, which runs without mail do not need
+                    import email_sender
+                    summary = store.summary(report.name) if store is not None else None
+                    email_sender.EmailSender(sharepoint_path, report.name, recipient, filename,
+                                             summary=summary_text(summary) if summary else None)
+        return path
+    finally:
+        os.remove(f'{path}.delivering')
+
+
+class ReportTracker:
+    """
+    Polls launched report runs with one listing request and hands each
+    completed report to a delivery function.
+    """
+
+    def __init__(self, sc, logger, poll_interval: float = 5, max_poll_interval: float = 120,
+                 timeout: float = 3600, max_workers: int = 4):
+        """
+        Args:
+            sc (TenablescAPI): Logged-in Tenable.sc client
+            logger (logging.Logger): Script logger
+            poll_interval (float): Seconds before the first poll, and after a poll that found completed reports
+            max_poll_interval (float): Longest wait, in seconds, between polls
+            timeout (float): Seconds wait() keeps polling after the last launch
+            max_workers (int): Reports delivered at the same time
+        """
+        self.sc = sc
+        self.logger = logger
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.delivered = 0
+        self.failed = []
+        self._jobs = {}
+        self._since = None
+        self._deadline = None
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread = None
+
+    def launch(self, definition_id: str, name: str) -> str:
+        """
+        Launches a report definition and tracks its run.
+
+        Args:
+            definition_id (str): Report definition id
+            name (str): Report name, for the log
+
+        Returns:
+            str: Report result id
+        """
+        launched_at = int(time.time())
+        result_id = self.sc.LaunchReport(definition_id)
+        with self._lock:
+            self._jobs[result_id] = name
+            if self._since is None:
+                self._since = launched_at
+        return result_id
+
+    def start(self, deliver):
+        """
+        Starts polling on a background thread, so reports launched early are
+        delivered while later ones are still being created.
+
+        Args:
+            deliver (callable): Called with each completed Report, on a worker thread
+        """
+        self._thread = threading.Thread(target=self._run, args=(deliver,), name='report-tracker', daemon=True)
+        self._thread.start()
+
+    def wait(self) -> dict:
+        """
+        Waits, up to the timeout, for every launched report to be delivered.
+
+        Returns:
+            dict: {'delivered': number of delivered reports, 'failed': names of failed reports,
+                   'pending': names of reports still running at the timeout}
+        """
+        self._deadline = time.monotonic() + self.timeout
+        self._closed.set()
+        self._thread.join()
+        with self._lock:
+            pending = sorted(self._jobs.values())
+            failed = sorted(self.failed)
+        return {'delivered': self.delivered, 'failed': failed, 'pending': pending}
+
+    def stop(self):
+        """Stops polling after the current poll, e.g. when the script exits on an error."""
+        self._deadline = 0
+        self._closed.set()
+
+    def poll(self) -> list:
+        """
+        Lists the report results launched since the first launch, in one request.
+
+        Returns:
+            list: Report records of the tracked runs
+        """
+        # Runs complete on the server without a write from this client, so the listing is never served from the cache
+        reports = self.sc.GetReports({'startTime': self._since, 'fields': 'id,name,type,status,finishTime'},
+                                     use_cache=False)
+        with self._lock:
+            return [report for report in reports if report.id in self._jobs]
+
+    def _run(self, deliver):
+        delay = self.poll_interval
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                with self._lock:
+                    idle = not self._jobs
+                if self._closed.is_set() and (idle or time.monotonic() >= self._deadline):
+                    break
+                if idle:
+                    self._closed.wait(self.poll_interval)
+                    continue
+                if self._closed.is_set():
+                    time.sleep(max(0.0, min(delay, self._deadline - time.monotonic())))
+                else:
+                    time.sleep(delay)
+
+                try:
+                    reports = self.poll()
+                except (Exception, SystemExit) as e:
+                    delay = min(delay * 2, self.max_poll_interval)
+                    self.logger.warning(f'Failed to list report results, retrying in {delay:.0f}s: {e}')
+                    continue
+
+                finished = False
+                for report in reports:
+                    if report.status == COMPLETED_STATUS:
+                        with self._lock:
+                            del self._jobs[report.id]
+                        executor.submit(self._deliver, deliver, report)
+                        finished = True
+                    elif report.status in FAILED_STATUSES:
+                        with self._lock:
+                            del self._jobs[report.id]
+                            self.failed.append(report.name)
+                        self.logger.error(f'Report {report.name} (result {report.id}) ended with status {report.status}')
+                        finished = True
+                # Poll again soon while reports finish, back off while they are all still running
+                delay = self.poll_interval if finished else min(delay * 2, self.max_poll_interval)
+
+    def _deliver(self, deliver, report):
+        try:
+            deliver(report)
+            with self._lock:
+                self.delivered += 1
+            self.logger.info(f'Report {report.name} delivered (result {report.id})', extra=SAMPLED)
+        except (Exception, SystemExit) as e:
+            with self._lock:
+                self.failed.append(report.name)
+            self.logger.error(f'Failed to deliver report {report.name} (result {report.id}): {e}')
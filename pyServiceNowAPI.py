@@ -20,7 +20,9 @@ Requirements:
 # Import required Python modules
 import json
 import sys
+import time
 import requests
+from pyMetrics import RequestMetrics
 requests.packages.urllib3.disable_warnings()  # Disable SSL warnings if necessary
 
 # ===================================================================
@@ -32,7 +34,7 @@ class SrvNowAPI:
     A class to handle ServiceNow API calls, providing methods for making authenticated requests.
     """
 
-    def __init__(self, username: str, password: str, url: str):
+    def __init__(self, username: str, password: str, url: str, instance: str = ''):
         """
         Initialize the ServiceNow API client with username, password, and base URL.
         
@@ -40,10 +42,14 @@ class SrvNowAPI:
             username (str): ServiceNow username
             password (str): ServiceNow password
             url (str): Base URL of the ServiceNow instance
+            instance (str): Console name for the metrics labels, when several consoles are used
         """
         self.username = username
         self.password = password
         self.url = url
+        self.metrics = RequestMetrics('servicenow', instance)
+        # One pooled session keeps TCP/TLS connections alive across requests
+        self.session = requests.Session()
 
     def create_url(self, endpoint: str) -> str:
         """
@@ -86,14 +92,21 @@ class SrvNowAPI:
         # Determine the HTTP method and make the corresponding API call
         url = self.create_url(endpoint)
         response = None
-        if method == 'GET':
-            response = requests.get(url, auth=auth, headers=headers, verify=True)
-        elif method == "POST":
-            response = requests.post(url, auth=auth, headers=headers, data=data, verify=True)
-        elif method == 'PATCH':
-            response = requests.patch(url, auth=auth, headers=headers, data=data, verify=True)
-        elif method == "DELETE":
-            response = requests.delete(url, auth=auth, headers=headers, data=data, verify=True)
+        started = time.perf_counter()
+        try:
+            if method == 'GET':
+                response = self.session.get(url, auth=auth, headers=headers, verify=True)
+            elif method == "POST":
+                response = self.session.post(url, auth=auth, headers=headers, data=data, verify=True)
+            elif method == 'PATCH':
+                response = self.session.patch(url, auth=auth, headers=headers, data=data, verify=True)
+            elif method == "DELETE":
+                response = self.session.delete(url, auth=auth, headers=headers, data=data, verify=True)
+        except Exception:
+            self.metrics.record(method, endpoint, time.perf_counter() - started, error=True)
+            raise
+        self.metrics.record(method, endpoint, time.perf_counter() - started, len(response.content),
+                            error=response.status_code != 200)
 
         # Check if the response status code indicates an error
         if response.status_code != 200:
@@ -20,17 +20,122 @@ Requirements:
 # Import required Python modules
 import json
 import re
-import sys
+import threading
+import time
+from collections import OrderedDict
 import requests
+from pyMetrics import RequestMetrics
+from pyRecords import Asset, Report, Finding
 requests.packages.urllib3.disable_warnings()  # Disable SSL warnings
 
+# Status codes with which Tenable.sc rejects a missing or expired session
+AUTH_ERROR_STATUSES = (401, 403)
+
+
+class TenableAPIError(SystemExit):
+    """
+    Raised by HTTPRequest for a non-200 response. It is a SystemExit, so a
+    script still exits with the API error message, while a caller that keeps
+    running (e.g. Scheduler_Daemon.py) can tell session errors apart.
+    """
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @property
+    def is_auth_error(self) -> bool:
+        """True when Tenable.sc rejected the session, so logging in again may help."""
+        return self.status_code in AUTH_ERROR_STATUSES
+
+class ResponseCache:
+    """
+    A small LRU cache for idempotent GET responses.
+
+    Entries are keyed by endpoint and request parameters, expire after a short
+    TTL, and are evicted least-recently-used first once the total size of the
+    cached response bodies exceeds max_bytes.
+    """
+
+    # Writes to a resource that change how other resources list, e.g. launching
+    # a report definition adds a result to the 'report' listing
+    RELATED = {'reportDefinition': ('report',)}
+
+    def __init__(self, ttl: float = 30, max_bytes: int = 50 * 1024 * 1024):
+        """
+        Args:
+            ttl (float): Seconds a cached response stays valid
+            max_bytes (int): Upper bound on the summed size of cached bodies
+        """
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(endpoint: str, data: dict = None) -> tuple:
+        """Builds a cache key from the endpoint and its parameters."""
+        return endpoint, json.dumps(data, sort_keys=True) if data is not None else None
+
+    @staticmethod
+    def resource(endpoint: str) -> str:
+        """Returns the resource an endpoint belongs to, e.g. 'asset' for 'asset/12?fields=id'."""
+        return endpoint.split('?', 1)[0].split('/', 1)[0]
+
+    def get(self, key: tuple):
+        """Returns the cached response for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, response = entry
+            if expires < time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def put(self, key: tuple, response):
+        """Stores a response and evicts the oldest entries over the byte bound."""
+        size = len(response.content)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, response)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, endpoint: str):
+        """Drops every cached response for the resource the endpoint belongs to, and for its RELATED resources."""
+        resource = self.resource(endpoint)
+        resources = (resource, *self.RELATED.get(resource, ()))
+        with self._lock:
+            for key in [k for k in self._entries if self.resource(k[0]) in resources]:
+                self._drop(key)
+
+    def clear(self):
+        """Drops every cached response."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _drop(self, key: tuple):
+        _, response = self._entries.pop(key)
+        self._bytes -= len(response.content)
+
+
 class TenablescAPI:
     """
     A class to handle Tenable.sc API calls.
     Handles authentication, token management, and HTTP requests.
     """
 
-    def __init__(self, username: str, password: str, url: str):
+    def __init__(self, username: str, password: str, url: str, cache_ttl: float = 0,
+                 cache_max_bytes: int = 50 * 1024 * 1024, rate_limit: float = 0, instance: str = ''):
         """
         Initialize the Tenable.sc API client with username, password, and URL.
         
@@ -38,12 +143,37 @@ class TenablescAPI:
             username (str): Tenable.sc username
             password (str): Tenable.sc password
             url (str): Base URL of the Tenable.sc instance
+            cache_ttl (float): Seconds to cache GET responses; 0 disables the cache
+            cache_max_bytes (int): Upper bound on the size of cached GET responses
+            rate_limit (float): Maximum requests per second across all threads; 0 is unlimited
+            instance (str): Console name for the metrics labels, when several consoles are used
         """
         self.username = username
         self.password = password
         self.url = url
         self.cookie = None
         self.token = None
+        self.cache = ResponseCache(cache_ttl, cache_max_bytes) if cache_ttl > 0 else None
+        self.metrics = RequestMetrics('tenablesc', instance)
+        # One pooled session keeps TCP/TLS connections alive across requests
+        self.session = requests.Session()
+        self.rate_limit = rate_limit
+        self._next_slot = 0.0
+        self._throttle_lock = threading.Lock()
+
+    def throttle(self):
+        """
+        Blocks until the client may send its next request under rate_limit.
+        Safe to call from several worker threads sharing one client.
+        """
+        if self.rate_limit <= 0:
+            return
+        with self._throttle_lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + 1.0 / self.rate_limit
+        if wait > 0:
+            time.sleep(wait)
 
     def create_url(self, endpoint: str) -> str:
         """
@@ -57,7 +187,8 @@ class TenablescAPI:
         """
         return f"{self.url}{endpoint}"
 
-    def HTTPRequest(self, method: str, endpoint: str, data: dict = None, headers: dict = None):
+    def HTTPRequest(self, method: str, endpoint: str, data: dict = None, headers: dict = None,
+                    use_cache: bool = True):
         """
         Handles HTTP requests to the Tenable.sc API.
         
@@ -66,35 +197,52 @@ class TenablescAPI:
             endpoint (str): API endpoint to hit
             data (dict): Optional request payload for 'POST', 'PATCH', etc.
             headers (dict): Optional HTTP headers
+            use_cache (bool): False sends a GET even when the cache holds its response, e.g. to poll a status
         
         Returns:
             requests.Response: Response object from the API call
 
         Raises:
-            SystemExit: Exits the script if the response status code is not 200
+            TenableAPIError: A SystemExit with the API error message if the response status code is not 200
         """
         if headers is None:
             headers = {'Content-Type': 'application/json', 'X-SecurityCenter': str(self.token)}
 
+        # Serve repeated GETs from the cache
+        cache_key = None
+        if self.cache is not None and method == 'GET':
+            cache_key = self.cache.make_key(endpoint, data)
+            cached = self.cache.get(cache_key) if use_cache else None
+            if cached is not None:
+                return cached
+
         if data is not None:
             data = json.dumps(data)
 
         # Make the appropriate HTTP request based on the method
+        self.throttle()
         url = self.create_url(endpoint)
         response = None
-        if method == 'GET':
-            response = requests.get(url, data=data, headers=headers, cookies=self.cookie, verify=False)
-        elif method == 'POST':
-            response = requests.post(url, data=data, headers=headers, cookies=self.cookie, verify=False)
-        elif method == 'PATCH':
-            response = requests.patch(url, data=data, headers=headers, cookies=self.cookie, verify=False)
-        elif method == 'DELETE':
-            response = requests.delete(url, data=data, headers=headers, cookies=self.cookie, verify=False)
+        started = time.perf_counter()
+        try:
+            if method == 'GET':
+                response = self.session.get(url, data=data, headers=headers, cookies=self.cookie, verify=False)
+            elif method == 'POST':
+                response = self.session.post(url, data=data, headers=headers, cookies=self.cookie, verify=False)
+            elif method == 'PATCH':
+                response = self.session.patch(url, data=data, headers=headers, cookies=self.cookie, verify=False)
+            elif method == 'DELETE':
+                response = self.session.delete(url, data=data, headers=headers, cookies=self.cookie, verify=False)
+        except Exception:
+            self.metrics.record(method, endpoint, time.perf_counter() - started, error=True)
+            raise
+        self.metrics.record(method, endpoint, time.perf_counter() - started, len(response.content),
+                            error=response.status_code != 200)
 
         # Check if the response status code is not 200, exit with error message
         if response.status_code != 200:
             error_msg = response.json().get('error_msg', 'Unknown error')
-            sys.exit(f"Error: {error_msg}")
+            raise TenableAPIError(f"Error: {error_msg}", response.status_code)
 
         # Extract and store the session cookie, if present in the response headers
         if 'set-cookie' in response.headers:
@@ -102,6 +250,12 @@ class TenablescAPI:
             if session_match:
                 self.cookie = session_match[0]
 
+        # Only a successful write changes the resource; drop its cached GETs, including any cached while it was in flight
+        if cache_key is not None:
+            self.cache.put(cache_key, response)
+        elif self.cache is not None:
+            self.cache.invalidate(endpoint)
+
         return response
 
     def LoginTenable(self):
@@ -123,3 +277,72 @@ class TenablescAPI:
 
         # Return the cookie and token for future requests
         return self.cookie, self.token
+
+    def GetAssets(self, fields: str = 'id,name,type,tags') -> list:
+        """
+        Lists usable assets, decoded into compact Asset records.
+
+        Args:
+            fields (str): Comma-separated asset fields to request
+
+        Returns:
+            list: Asset records for every usable asset
+        """
+        response = self.HTTPRequest('GET', f'asset?fields={fields}')
+        return [Asset.from_json(item) for item in response.json()['response']['usable']]
+
+    def GetReports(self, params: dict = None, use_cache: bool = True) -> list:
+        """
+        Lists report results, decoded into compact Report records.
+
+        Args:
+            params (dict): Optional filters such as 'startTime' and 'fields'
+            use_cache (bool): False lists the current statuses even when the GET cache holds the listing
+
+        Returns:
+            list: Report records for every usable report result
+        """
+        response = self.HTTPRequest('GET', 'report', data=params, use_cache=use_cache)
+        return [Report.from_json(item) for item in response.json().get('response', {}).get('usable', [])]
+
+    def LaunchReport(self, definition_id: str) -> str:
+        """
+        Launches a report definition.
+
+        Args:
+            definition_id (str): Report definition id, as returned when it was created
+
+        Returns:
+            str: Id of the report result, as listed by GetReports()
+        """
+        response = self.HTTPRequest('POST', f'reportDefinition/{definition_id}/launch')
+        return str(response.json()['response']['reportResult']['id'])
+
+    def QueryVulns(self, query: dict, asset_id: str = '') -> list:
+        """
+        Runs a vulnerability analysis query, decoded into compact Finding records.
+
+        Args:
+            query (dict): Full 'analysis' payload
+            asset_id (str): Asset id the query is filtered on, stored on each Finding
+
+        Returns:
+            list: Finding records for every row of the result page
+        """
+        response = self.HTTPRequest('POST', 'analysis', data=query)
+        return [Finding.from_json(item, asset_id) for item in response.json()['response']['results']]
+
+    def QueryVulnsPage(self, query: dict, asset_id: str = '') -> tuple:
+        """
+        Runs one page of a vulnerability analysis query, with the total row count for paging.
+
+        Args:
+            query (dict): Full 'analysis' payload, including 'startOffset' and 'endOffset'
+            asset_id (str): Asset id the query is filtered on, stored on each Finding
+
+        Returns:
+            tuple: (Finding records of the page, total rows matching the query)
+        """
+        result = self.HTTPRequest('POST', 'analysis', data=query).json()['response']
+        findings = [Finding.from_json(item, asset_id) for item in result['results']]
+        return findings, int(result.get('totalRecords') or 0)
@@ -0,0 +1,378 @@
+"""
+-------------------------------------------------------------------------------
+Name:           pyVulnStore.py
+
+Date:           19/10/2026
+
+Last Update:    19/10/2026
+
+Purpose:        Local SQLite store of Tenable.sc 'vulndetails' findings, filled
+                by a parallel, incremental export, so report decisions run
+                against local data instead of re-querying 'analysis'.
+
+Author:         Morteza Zeinali
+-------------------------------------------------------------------------------
+Usage:
+        from pyVulnStore import VulnStore, export_vulns, store_path
+        store = VulnStore(store_path(config, scriptloc), window_days=30, full_refresh_days=7)
+        export_vulns(sc, store, asset_ids, page_size=1000, max_workers=4)
+        severity = store.max_severity(asset_id)
+        store.close()
+
+   Findings are keyed by asset, plugin, IP, port and protocol and indexed on
+   plugin and lastSeen. The first export of an asset fetches the whole
+   'window_days' lastSeen window; later exports only fetch the days since
+   that asset's last successful refresh, and findings that have not been
+   seen within the window are purged. Every 'full_refresh_days' an asset is
+   exported over the whole window again and its findings that export did
+   not return (e.g. remediated ones) are dropped. Pages are fetched in
+   parallel and written in batches by the calling thread only, as SQLite
+   allows a single writer.
+
+   The store uses SQLite WAL mode, which needs a local disk; a UNC path
+   (a network share) is refused.
+-------------------------------------------------------------------------------
+"""
+
+# Import required Python modules
+import json
+import math
+import operator
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from pyRecords import Finding
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS findings (
+    asset_id TEXT NOT NULL,
+    plugin_id INTEGER NOT NULL,
+    plugin_name TEXT NOT NULL,
+    ip TEXT NOT NULL,
+    port INTEGER NOT NULL,
+    protocol TEXT NOT NULL,
+    severity INTEGER NOT NULL,
+    severity_name TEXT NOT NULL,
+    first_seen INTEGER NOT NULL,
+    last_seen INTEGER NOT NULL,
+    exported_at INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (asset_id, plugin_id, ip, port, protocol)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_findings_plugin ON findings (plugin_id);
+CREATE INDEX IF NOT EXISTS idx_findings_last_seen ON findings (last_seen);
+CREATE TABLE IF NOT EXISTS refreshes (
+    asset_id TEXT PRIMARY KEY,
+    refreshed_at INTEGER NOT NULL,
+    full_at INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS summaries (
+    name TEXT PRIMARY KEY,
+    summary TEXT NOT NULL,
+    computed_at INTEGER NOT NULL
+);
+"""
+
+_COLUMNS = ('asset_id', 'plugin_id', 'plugin_name', 'ip', 'port', 'protocol',
+            'severity', 'severity_name', 'first_seen', 'last_seen')
+
+# Finding -> row tuple in column order
+_row = operator.attrgetter(*_COLUMNS)
+
+# Columns added after the first release, created in existing stores on open
+_ADDED_COLUMNS = {
+    'findings': ('exported_at', 'INTEGER NOT NULL DEFAULT 0'),
+    'refreshes': ('full_at', 'INTEGER NOT NULL DEFAULT 0'),
+}
+
+
+def store_path(config, scriptloc: str, console: str = ''):
+    """
+    Returns the store file from the optional 'path' option of the [VulnStore]
+    section, or None when unset. A relative path is taken from the script
+    directory; console runs each get their own file, e.g. 'vulns.emea.db'.
+
+    Args:
+        config (ConfigParser): Parsed 'config.conf'
+        scriptloc (str): Directory of the calling script
+        console (str): Selected console name, or ''
+    """
+    path = config.get('VulnStore', 'path', fallback='')
+    if not path:
+        return None
+    if console:
+        root, ext = os.path.splitext(path)
+        path = f'{root}.{console}{ext}'
+    return os.path.join(scriptloc, path)
+
+
+class VulnStore:
+    """
+    SQLite-backed store of findings with per-asset refresh bookkeeping.
+    """
+
+    def __init__(self, path: str, window_days: int = 30, full_refresh_days: float = 7):
+        """
+        Opens (and creates if needed) the store.
+
+        Args:
+            path (str): SQLite database file
+            window_days (int): lastSeen window, in days, that the store keeps
+            full_refresh_days (float): Days between full exports of an asset, which drop its remediated findings
+
+        Raises:
+            ValueError: If the path is on a network share
+        """
+        if path.startswith(('\\\\', '//')):
+            raise ValueError(f'{path} is a network share; the findings store uses SQLite WAL mode, '
+                             'which needs a local disk. Set [VulnStore] path to a local file')
+        self.path = path
+        self.window_days = window_days
+        self.full_refresh_days = full_refresh_days
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        # Inserts land all over the primary key and the lastSeen index; keep their pages cached
+        self._db.execute('PRAGMA cache_size=-65536')
+        self._db.executescript(_SCHEMA)
+        for table, (column, definition) in _ADDED_COLUMNS.items():
+            if column not in {row[1] for row in self._db.execute(f'PRAGMA table_info({table})')}:
+                self._db.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+
+    def refresh_days(self, asset_id: str, now: int = None) -> int:
+        """
+        Returns the lastSeen window, in days, the next export of an asset must fetch;
+        'window_days' when a full export is due.
+
+        Args:
+            asset_id (str): Tenable.sc asset id
+            now (int): Current epoch time, for tests and consistent batches
+        """
+        now = now or int(time.time())
+        with self._lock:
+            row = self._db.execute('SELECT refreshed_at, full_at FROM refreshes WHERE asset_id = ?',
+                                   (str(asset_id),)).fetchone()
+        if row is None or now - row[1] >= self.full_refresh_days * 86400:
+            return self.window_days
+        # One extra day covers findings seen while the previous export ran
+        return max(1, min(self.window_days, math.ceil((now - row[0]) / 86400) + 1))
+
+    def add(self, findings: list, exported_at: int = 0):
+        """Inserts or replaces findings in one transaction, stamped with the time of their export."""
+        with self._lock, self._db:
+            self._db.executemany(
+                f'INSERT OR REPLACE INTO findings ({", ".join(_COLUMNS)}, exported_at) '
+                f'VALUES ({", ".join("?" * len(_COLUMNS))}, ?)',
+                ((*_row(finding), exported_at) for finding in findings))
+
+    def mark_refreshed(self, asset_ids: list, refreshed_at: int, full_ids: set = frozenset()):
+        """
+        Records complete exports of assets, the start of their next incremental
+        window. For the full exports in 'full_ids', the asset's findings that
+        export did not return are deleted in the same transaction.
+
+        Args:
+            asset_ids (list): Assets whose pages are all stored
+            refreshed_at (int): Epoch time the export started, as passed to add()
+            full_ids (set): Those of the assets exported over the whole window
+        """
+        with self._lock, self._db:
+            self._db.executemany('DELETE FROM findings WHERE asset_id = ? AND exported_at < ?',
+                                 [(str(asset_id), refreshed_at) for asset_id in asset_ids if asset_id in full_ids])
+            self._db.executemany(
+                'INSERT INTO refreshes (asset_id, refreshed_at, full_at) VALUES (?, ?, ?) '
+                'ON CONFLICT (asset_id) DO UPDATE SET refreshed_at = excluded.refreshed_at, '
+                'full_at = MAX(full_at, excluded.full_at)',
+                [(str(asset_id), refreshed_at, refreshed_at if asset_id in full_ids else 0)
+                 for asset_id in asset_ids])
+
+    def purge(self, now: int = None) -> int:
+        """
+        Deletes findings last seen before the window, i.e. no longer reported by Tenable.sc.
+
+        Returns:
+            int: Number of deleted findings
+        """
+        cutoff = (now or int(time.time())) - self.window_days * 86400
+        with self._lock, self._db:
+            return self._db.execute('DELETE FROM findings WHERE last_seen < ?', (cutoff,)).rowcount
+
+    def findings(self, asset_id: str = None, since: int = 0) -> list:
+        """
+        Returns stored findings as Finding records.
+
+        Args:
+            asset_id (str): Only this asset's findings; None for all assets
+            since (int): Only findings last seen at or after this epoch time
+        """
+        query = f'SELECT {", ".join(_COLUMNS)} FROM findings WHERE last_seen >= ?'
+        params = [since]
+        if asset_id is not None:
+            query += ' AND asset_id = ?'
+            params.append(str(asset_id))
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [Finding(*row) for row in rows]
+
+    def max_severity(self, asset_id: str, since: int = 0) -> int:
+        """
+        Returns the highest severity (0 = Info .. 4 = Critical) of an asset's findings.
+
+        Args:
+            asset_id (str): Tenable.sc asset id
+            since (int): Only findings last seen at or after this epoch time
+        """
+        with self._lock:
+            row = self._db.execute('SELECT MAX(severity) FROM findings WHERE asset_id = ? AND last_seen >= ?',
+                                   (str(asset_id), since)).fetchone()
+        return row[0] or 0
+
+    def iter_rows(self, columns: tuple, since: int = 0, batch: int = 100000, as_integers: bool = False):
+        """
+        Yields stored findings as lists of row tuples, 'batch' rows at a time,
+        so large stores can be loaded column-wise without one huge list. The
+        store is locked until the iteration ends, so do not call it meanwhile.
+
+        Args:
+            columns (tuple): Column names, e.g. ('asset_id', 'severity')
+            since (int): Only findings last seen at or after this epoch time
+            batch (int): Rows per yielded list
+            as_integers (bool): Let SQLite cast every column to INTEGER, e.g. the TEXT asset ids
+        """
+        unknown = set(columns) - set(_COLUMNS)
+        if unknown:
+            raise ValueError(f'Unknown findings columns: {", ".join(sorted(unknown))}')
+        selected = [f'CAST({column} AS INTEGER)' if as_integers else column for column in columns]
+        # '+last_seen' keeps SQLite off the lastSeen index: nearly every row is in the window, and reading
+        # them through the index costs a primary key lookup per row, about three times a plain table scan
+        with self._lock:
+            cursor = self._db.execute(f'SELECT {", ".join(selected)} FROM findings WHERE +last_seen >= ?', (since,))
+            while True:
+                rows = cursor.fetchmany(batch)
+                if not rows:
+                    break
+                yield rows
+
+    def save_summaries(self, summaries: dict, computed_at: int = None):
+        """
+        Stores per-service summaries (e.g. from pyAnalytics.rollup) for later runs,
+        such as ReportDownloader.py adding them to the report emails.
+
+        Args:
+            summaries (dict): {service name: JSON-serialisable summary}
+            computed_at (int): Epoch time of the summaries
+        """
+        computed_at = computed_at or int(time.time())
+        with self._lock, self._db:
+            self._db.executemany('INSERT OR REPLACE INTO summaries (name, summary, computed_at) VALUES (?, ?, ?)',
+                                 [(name.upper(), json.dumps(summary), computed_at)
+                                  for name, summary in summaries.items()])
+
+    def summary(self, name: str):
+        """Returns the stored summary of a service (case-insensitive), or None."""
+        with self._lock:
+            row = self._db.execute('SELECT summary FROM summaries WHERE name = ?', (name.upper(),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def vuln_query(asset_id: str, days: int, start: int, end: int) -> dict:
+    """Returns the 'analysis' payload for one page of an asset's vulndetails."""
+    return {
+        "query": {
+            "type": "vuln",
+            "tool": "vulndetails",
+            "startOffset": str(start),
+            "endOffset": str(end),
+            "filters": [
+                {"filterName": "lastSeen", "operator": "=", "value": f"00:{days}"},
+                {"filterName": "asset", "operator": "=", "value": {"id": asset_id}}
+            ]
+        },
+        "type": "vuln",
+        "sourceType": "cumulative"
+    }
+
+
+def export_vulns(sc, store: VulnStore, asset_ids: list, page_size: int = 1000, max_workers: int = 4,
+                 batch_rows: int = 20000, logger=None) -> dict:
+    """
+    Exports the findings of the given assets into the store. The first page
+    of every asset is requested up front; the remaining pages are queued as
+    soon as the first page reports the total, so all pages run in parallel.
+    Pages are written in transactions of about 'batch_rows' rows, as one
+    commit per page costs more than the inserts. An asset only counts as
+    refreshed once every one of its pages is committed; a full export then
+    replaces the asset's findings.
+
+    Args:
+        sc (TenablescAPI): Logged-in Tenable.sc client
+        store (VulnStore): Target store
+        asset_ids (list): Tenable.sc asset ids to export
+        page_size (int): Rows per 'analysis' request
+        max_workers (int): Concurrent 'analysis' requests
+        batch_rows (int): Rows buffered before they are committed
+        logger (logging.Logger): Optional logger for progress and failures
+
+    Returns:
+        dict: {'assets': number of refreshed assets, 'failed': ids of failed assets,
+               'rows': stored rows, 'purged': purged rows, 'full': number of full refreshes}
+    """
+    now = int(time.time())
+    days = {str(asset_id): store.refresh_days(asset_id, now) for asset_id in asset_ids}
+    full = {asset_id for asset_id, window in days.items() if window >= store.window_days}
+    failed = set()
+    rows = 0
+    buffered, completed = [], []
+
+    def flush():
+        store.add(buffered, now)
+        store.mark_refreshed(completed, now, full)
+        buffered.clear()
+        completed.clear()
+
+    def fetch_page(asset_id, start):
+        return asset_id, start, sc.QueryVulnsPage(vuln_query(asset_id, days[asset_id], start, start + page_size),
+                                                  asset_id)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch_page, asset_id, 0): asset_id for asset_id in days}
+        outstanding = {asset_id: 1 for asset_id in days}
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                asset_id = futures.pop(future)
+                try:
+                    _, start, (findings, total) = future.result()
+                except (Exception, SystemExit) as e:
+                    failed.add(asset_id)
+                    if logger:
+                        logger.error(f'Failed to export findings of asset {asset_id}: {e}')
+                    continue
+
+                buffered.extend(findings)
+                rows += len(findings)
+                outstanding[asset_id] -= 1
+                if start == 0:
+                    for offset in range(page_size, total, page_size):
+                        futures[executor.submit(fetch_page, asset_id, offset)] = asset_id
+                        outstanding[asset_id] += 1
+                if outstanding[asset_id] == 0 and asset_id not in failed:
+                    completed.append(asset_id)
+            if len(buffered) >= batch_rows:
+                flush()
+    flush()
+
+    purged = store.purge(now)
+    result = {'assets': len(days) - len(failed), 'failed': sorted(failed), 'rows': rows, 'purged': purged,
+              'full': len(full - failed)}
+    if logger:
+        logger.info(f'Exported {rows} findings of {result["assets"]} assets to {store.path} '
+                    f'({result["full"]} full refreshes, {len(failed)} failed, {purged} expired findings purged)')
+    return result
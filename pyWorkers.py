@@ -0,0 +1,75 @@
+"""
+-------------------------------------------------------------------------------
+Name:           pyWorkers.py
+
+Date:           19/10/2026
+
+Last Update:    19/10/2026
+
+Purpose:        Imports the main scripts by file name, and gives worker
+                processes an importable entry point into them.
+
+Author:         Morteza Zeinali
+-------------------------------------------------------------------------------
+Usage:
+        from pyWorkers import call_script, load_script
+        module = load_script(scriptloc, 'ServiceNow_2_Tenable.sc.py')
+
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=n, mp_context=context) as executor:
+            executor.submit(call_script, __file__, 'sync_shard', number, ...)
+
+   Worker processes are always spawned, never forked: forking a process
+   that runs threads (e.g. 'Scheduler_Daemon.py') can copy locks held by
+   another thread, and Windows can only spawn. A spawned worker cannot
+   unpickle a function of a script loaded under a made-up module name, so
+   it is handed call_script() from this module, which imports the script
+   itself by path.
+-------------------------------------------------------------------------------
+"""
+
+# Import required Python modules
+import importlib.util
+import os
+import sys
+
+
+def load_script(scriptloc: str, filename: str):
+    """
+    Imports a main script by file name; some names, e.g. 'ServiceNow_2_Tenable.sc.py',
+    are not valid module names.
+
+    Args:
+        scriptloc (str): Directory of the script
+        filename (str): Script file name
+
+    Returns:
+        module: The imported script, also registered in sys.modules
+    """
+    module_name = os.path.splitext(filename)[0].replace('.', '_')
+    module = sys.modules.get(module_name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(module_name, os.path.join(scriptloc, filename))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+def call_script(script: str, function: str, *args):
+    """
+    Worker process entry point: calls a function of a main script.
+
+    Args:
+        script (str): Path of the main script
+        function (str): Name of the function to call
+        *args: Arguments for the function
+
+    Returns:
+        The function's return value
+    """
+    # The spawned worker already ran the script as '__mp_main__' when it is the parent's main script
+    module = sys.modules.get('__mp_main__')
+    if os.path.realpath(getattr(module, '__file__', None) or '') != os.path.realpath(script):
+        module = load_script(os.path.dirname(os.path.abspath(script)), os.path.basename(script))
+    return getattr(module, function)(*args)
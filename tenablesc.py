@@ -0,0 +1,247 @@
+'''-------------------------------------------------------------------------------
+Name:           tenablesc.py (Main Script)
+
+Date:           19/10/2026
+
+Last update:    19/10/2026
+
+Purpose:        One command for all main scripts, which loads only the modules
+                the chosen subcommand needs.
+
+The following subcommands are available:
+
+                sync              ServiceNow_2_Tenable.sc.py
+                create-reports    ReportCreator.py
+                download-reports  ReportDownloader.py
+                combine-assets    Combination_Asset_Creator.py
+                check             Check 'config.conf' for every subcommand, e.g. as a
+                                  health check; imports neither 'requests' nor 'bs4'
+                imports           Report the import time of every subcommand
+
+                Options after the subcommand are checked against the ones its script
+                takes ('tenablesc.py <subcommand> -h' lists them), then passed
+                to the script unchanged, e.g.
+                        python tenablesc.py sync --shards 8 --profile
+                        python tenablesc.py download-reports --console emea
+                        python tenablesc.py create-reports --profile
+                        python tenablesc.py check
+                        python tenablesc.py imports sync download-reports
+
+                1. Nothing is imported up front: a subcommand runs its script as if it
+                   was started directly, so it only loads that script's modules.
+                   'sync', 'download-reports' and 'combine-assets' import 'requests'
+                   with their API modules when the script starts, 'create-reports'
+                   at login; BeautifulSoup is loaded when a report is mailed and
+                   NumPy when findings are summarised.
+                2. 'config.conf' is parsed once; the script and its logger share the
+                   parse (see 'read_config' in 'pyConsoles.py').
+                3. 'imports' runs each subcommand's imports in a fresh interpreter with
+                   'python -X importtime' and lists the slowest modules.
+
+Author:         Morteza Zeinali
+-------------------------------------------------------------------------------
+Requirements:
+
+   Please first define the credential data into 'config.conf' before running the script.
+   Each subcommand logs to the log of its script, e.g. 'ReportDownloader.log'.
+
+'''
+
+# Import python modules
+import argparse
+import os
+import runpy
+import subprocess
+import sys
+
+scriptloc = os.path.join(os.path.dirname(os.path.realpath(__file__)), '')
+configfile = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.conf')
+
+# Subcommand: (script file, help text)
+COMMANDS = {
+    'sync': ('ServiceNow_2_Tenable.sc.py', 'Sync ServiceNow services to Tenable.sc assets'),
+    'create-reports': ('ReportCreator.py', 'Create Tenable.sc reports for vulnerable assets'),
+    'download-reports': ('ReportDownloader.py', 'Download finished reports to SharePoint and email them'),
+    'combine-assets': ('Combination_Asset_Creator.py', 'Create or update the combination asset'),
+}
+
+# Options every script takes: (flag, argparse settings)
+SCRIPT_OPTIONS = (
+    ('--console', {'metavar': 'NAME', 'help': 'Run for the [tenable.sc:<NAME>] console only'}),
+    ('--profile', {'action': 'store_true', 'help': 'Write cProfile/tracemalloc output next to the log'}),
+)
+
+# Options of single subcommands, on top of SCRIPT_OPTIONS
+COMMAND_OPTIONS = {
+    'sync': (('--shards', {'type': int, 'metavar': 'N',
+                           'help': "Sync worker processes (default: 'shards' in [SrvNow])"}),),
+}
+
+# Options every Tenable.sc console needs
+SC_OPTIONS = ('sc_host', 'sc_username', 'sc_password')
+
+# Sections and options each subcommand needs besides the Tenable.sc login
+REQUIRED = {
+    'sync': {'SrvNow': ('srvnow_url', 'srvnow_username', 'srvnow_password')},
+    'create-reports': {'CustomReport': ()},
+    'download-reports': {'Reports': ('sharepoint_path',)},
+    'combine-assets': {},
+}
+
+# ===================================================================
+# Subcommands
+# ===================================================================
+
+def run_command(command, args):
+    """Run the script of a subcommand as '__main__', exactly as if it was started directly"""
+    script = os.path.join(scriptloc, COMMANDS[command][0])
+    sys.argv = [script, *args]
+    runpy.run_path(script, run_name='__main__')
+
+
+def check_config(commands):
+    """
+    Check that 'config.conf' has what the given subcommands need.
+
+    Returns:
+        list: One message per missing section or option, empty when complete
+    """
+    from pyConsoles import CONSOLE_SECTION, console_config, console_names, read_config
+
+    if not os.path.exists(configfile):
+        return [f'{configfile} does not exist']
+    config = read_config(configfile)
+    problems = []
+    # Every console is checked as its own run sees the file
+    for console in console_names(config) or ['']:
+        view = console_config(config, console)
+        where = f' (console {console})' if console else ''
+        for option in SC_OPTIONS:
+            if not view.get(CONSOLE_SECTION, option, fallback=''):
+                problems.append(f'Missing {option} in [{CONSOLE_SECTION}]{where}')
+    for command in commands:
+        for section, options in REQUIRED[command].items():
+            if not config.has_section(section):
+                problems.append(f'{command}: missing section [{section}]')
+                continue
+            for option in options:
+                if not config.get(section, option, fallback=''):
+                    problems.append(f'{command}: missing {option} in [{section}]')
+    return problems
+
+
+def import_times(command, top=8):
+    """
+    Import the modules of a subcommand in a fresh interpreter with '-X importtime'.
+
+    Returns:
+        tuple: (total seconds, [(module, cumulative seconds)] of the 'top' slowest top-level imports)
+    """
+    script = os.path.join(scriptloc, COMMANDS[command][0]) if command else os.path.realpath(__file__)
+    # Load the script as a module (not '__main__'), so it sets up but does not run
+    code = ("import importlib.util, sys\n"
+            f"sys.argv = [{script!r}]\n"
+            "sys.stderr.write('-- start\\n'); sys.stderr.flush()\n"
+            f"spec = importlib.util.spec_from_file_location('imported_script', {script!r})\n"
+            "module = importlib.util.module_from_spec(spec)\n"
+            "spec.loader.exec_module(module)\n"
+            "sys.stderr.write('-- end\\n'); sys.stderr.flush()\n"
+            "log = getattr(module, 'log_instance', None) or getattr(module, 'loginstance', None)\n"
+            "log and log.closeHandlers()\n")
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=scriptloc,
+                               stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                               text=True)
+    lines = completed.stderr.splitlines()
+    if '-- start' not in lines or '-- end' not in lines:
+        raise RuntimeError(f'Failed to import {script}: {completed.stderr.strip()[-500:]}')
+    lines = lines[lines.index('-- start') + 1:lines.index('-- end')]
+
+    # 'import time: self [us] | cumulative | imported package', nested imports indented by two spaces
+    modules = []
+    for line in lines:
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            modules.append((len(name) - len(name.lstrip()), name.strip(), int(cumulative) / 1e6))
+    if not modules:
+        return 0.0, []
+    top_level = min(depth for depth, _, _ in modules)
+    imports = [(name, seconds) for depth, name, seconds in modules if depth == top_level]
+    return sum(seconds for _, seconds in imports), sorted(imports, key=lambda item: -item[1])[:top]
+
+
+def import_report(commands):
+    """Print the import time of the command itself and of each subcommand"""
+    for command in [None, *commands]:
+        total, slowest = import_times(command)
+        print(f'{command or "tenablesc":<18}{total * 1000:>9.1f} ms')
+        for name, seconds in slowest:
+            print(f'    {name:<30}{seconds * 1000:>9.1f} ms')
+
+
+def script_parser(command):
+    """Parser of the options a script subcommand takes, for its help and to reject unknown options"""
+    script, help_text = COMMANDS[command]
+    parser = argparse.ArgumentParser(prog=f'tenablesc {command}', description=f'{help_text} ({script})')
+    for flag, settings in (*SCRIPT_OPTIONS, *COMMAND_OPTIONS.get(command, ())):
+        parser.add_argument(flag, **settings)
+    return parser
+
+
+def parse_args(argv):
+    """
+    Parse the command line. The arguments of a script subcommand are only
+    checked here, '-h' and errors exit like any argparse command line, and
+    then passed on to the script unchanged.
+
+    Returns:
+        argparse.Namespace: 'command', and 'args' for a script subcommand or 'commands' for 'check' and 'imports'
+    """
+    if argv and argv[0] in COMMANDS:
+        script_parser(argv[0]).parse_args(argv[1:])
+        return argparse.Namespace(command=argv[0], args=list(argv[1:]))
+
+    parser = argparse.ArgumentParser(prog='tenablesc', description='Tenable.sc and ServiceNow integration scripts')
+    subparsers = parser.add_subparsers(dest='command', required=True, metavar='command')
+    for command, (script, help_text) in COMMANDS.items():
+        subparsers.add_parser(command, help=f'{help_text} ({script}); arguments go to the script')
+    for command, help_text in (('check', "Check 'config.conf' for the given subcommands (default: all)"),
+                               ('imports', 'Report the import time of the given subcommands (default: all)')):
+        subparser = subparsers.add_parser(command, help=help_text)
+        subparser.add_argument('commands', nargs='*', metavar='subcommand')
+
+    arguments = parser.parse_args(argv)
+    unknown = [command for command in getattr(arguments, 'commands', []) if command not in COMMANDS]
+    if unknown:
+        parser.error(f'unknown subcommand(s): {", ".join(unknown)} (choose from {", ".join(COMMANDS)})')
+    return arguments
+
+
+def main(argv):
+    """
+    Run a subcommand.
+
+    Args:
+        argv (list): Command line arguments, without the program name
+
+    Returns:
+        int: Exit status
+    """
+    arguments = parse_args(argv)
+
+    if arguments.command in COMMANDS:
+        run_command(arguments.command, arguments.args)
+    elif arguments.command == 'check':
+        problems = check_config(arguments.commands or list(COMMANDS))
+        for problem in problems:
+            print(problem)
+        print('config.conf: ' + (f'{len(problems)} problem(s)' if problems else 'OK'))
+        return 1 if problems else 0
+    elif arguments.command == 'imports':
+        import_report(arguments.commands or list(COMMANDS))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,106 @@
+"""
+-------------------------------------------------------------------------------
+Name:           test_pyAnalytics.py
+
+Date:           19/10/2026
+
+Last Update:    19/10/2026
+
+Purpose:        Checks the NumPy rollups of the findings store: the loaded
+                column arrays, the per-asset and per-service counts, the
+                new / persisting / resolved trend and the email line.
+
+Author:         Morteza Zeinali
+-------------------------------------------------------------------------------
+Usage:
+        python -m unittest discover tests
+
+   Skipped when NumPy is not installed.
+-------------------------------------------------------------------------------
+"""
+
+# Import required Python modules
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyAnalytics
+from pyRecords import Finding
+from pyVulnStore import VulnStore
+
+DAY = 86400
+NOW = 1_800_000_000
+
+
+def finding(asset_id, plugin_id, severity, first_seen, last_seen):
+    return Finding(asset_id=str(asset_id), plugin_id=plugin_id, plugin_name='', ip='10.0.0.1', port=0,
+                   protocol='TCP', severity=severity, severity_name='', first_seen=first_seen, last_seen=last_seen)
+
+
+@unittest.skipUnless(pyAnalytics.available(), 'NumPy is not installed')
+class AnalyticsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.store = VulnStore(os.path.join(self.folder.name, 'vulns.db'))
+        self.store.add([
+            # Asset 12: new Critical, persisting Medium, resolved Low
+            finding(12, 1, 4, NOW - DAY, NOW),
+            finding(12, 2, 2, NOW - 20 * DAY, NOW),
+            finding(12, 3, 1, NOW - 20 * DAY, NOW - 10 * DAY),
+            # Asset 7: Info only
+            finding(7, 1, 0, NOW - 2 * DAY, NOW),
+            # Asset 30: seen before 'since'
+            finding(30, 1, 3, NOW - 60 * DAY, NOW - 40 * DAY),
+        ])
+
+    def tearDown(self):
+        self.store.close()
+        self.folder.cleanup()
+
+    def test_load_findings(self):
+        findings = pyAnalytics.load_findings(self.store, since=NOW - 30 * DAY, batch=2)
+        self.assertEqual(set(findings), set(pyAnalytics.COLUMNS))
+        self.assertEqual(findings['asset_id'].dtype, 'int64')
+        self.assertEqual(findings['severity'].dtype, 'int8')
+        self.assertEqual(sorted(findings['asset_id'].tolist()), [7, 12, 12, 12])
+
+        empty = pyAnalytics.load_findings(self.store, since=NOW + DAY)
+        self.assertEqual({column: len(values) for column, values in empty.items()},
+                         dict.fromkeys(pyAnalytics.COLUMNS, 0))
+        self.assertEqual(pyAnalytics.rollup(empty, NOW), {})
+
+    def test_rollup_per_asset(self):
+        summaries = pyAnalytics.rollup(pyAnalytics.load_findings(self.store), NOW, period_days=7)
+        self.assertEqual(set(summaries), {'7', '12', '30'})
+        asset = summaries['12']
+        self.assertEqual(asset['severity_counts'], {'Info': 0, 'Low': 1, 'Medium': 1, 'High': 0, 'Critical': 1})
+        self.assertEqual((asset['max_severity'], asset['max_severity_name']), (4, 'Critical'))
+        self.assertEqual((asset['findings'], asset['new'], asset['persisting'], asset['resolved']), (3, 1, 1, 1))
+        self.assertEqual(asset['mean_age_days'], round((1 + 20 + 10) / 3, 1))
+        self.assertEqual((summaries['7']['max_severity'], summaries['7']['max_severity_name']), (0, 'Info'))
+        self.assertEqual(summaries['30']['resolved'], 1)
+
+    def test_rollup_per_service(self):
+        findings = pyAnalytics.load_findings(self.store, since=NOW - 30 * DAY)
+        summaries = pyAnalytics.rollup(findings, NOW, names={'12': 'SVC1', '7': 'SVC1'})
+        self.assertEqual(list(summaries), ['SVC1'])
+        self.assertEqual(summaries['SVC1']['findings'], 4)
+        self.assertEqual(summaries['SVC1']['severity_counts']['Info'], 1)
+
+        summaries = pyAnalytics.rollup(findings, NOW, names={'12': 'SVC1'})
+        self.assertEqual(set(summaries), {'SVC1', '7'})
+
+    def test_summary_text(self):
+        summaries = pyAnalytics.rollup(pyAnalytics.load_findings(self.store), NOW)
+        self.assertEqual(pyAnalytics.summary_text(summaries['12']),
+                         '3 findings (1 Critical, 1 Medium, 1 Low); 1 new, 1 persisting, 1 resolved; '
+                         'mean age 10.3 days')
+        self.assertTrue(pyAnalytics.summary_text(summaries['7']).startswith('1 findings (no Low or higher)'))
+
+
+if __name__ == '__main__':
+    unittest.main()
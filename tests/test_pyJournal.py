@@ -0,0 +1,146 @@
+"""
+-------------------------------------------------------------------------------
+Name:           test_pyJournal.py
+
+Date:           19/10/2026
+
+Last Update:    19/10/2026
+
+Purpose:        Checks that 'SyncJournal' resumes an interrupted run, starts
+                over after a completed one, and does not resume a run that
+                is too old or from another window.
+
+Author:         Morteza Zeinali
+-------------------------------------------------------------------------------
+Usage:
+        python -m unittest discover tests
+-------------------------------------------------------------------------------
+"""
+
+# Import required Python modules
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyJournal import SyncJournal
+
+
+class SyncJournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, 'script.journal')
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_interrupted_run_resumes(self):
+        journal = SyncJournal(self.path)
+        for op in ('service:1:aa', 'service:2:bb'):
+            journal.planned(op)
+        journal.done('service:1:aa')
+        journal.close()
+
+        resumed = SyncJournal(self.path)
+        self.assertTrue(resumed.resumed)
+        self.assertEqual(resumed.run_id, journal.run_id)
+        self.assertTrue(resumed.is_done('service:1:aa'))
+        self.assertFalse(resumed.is_done('service:2:bb'))
+        self.assertEqual(resumed.pending, {'service:2:bb'})
+        resumed.close()
+
+    def test_completed_run_starts_over(self):
+        journal = SyncJournal(self.path)
+        journal.planned('service:1:aa')
+        journal.done('service:1:aa')
+        journal.complete()
+
+        second = SyncJournal(self.path)
+        self.assertFalse(second.resumed)
+        self.assertIsNone(second.expired)
+        self.assertNotEqual(second.run_id, journal.run_id)
+        self.assertFalse(second.is_done('service:1:aa'))
+        second.close()
+
+    def test_run_with_failures_does_not_block_the_next_run(self):
+        # A run attempts every operation, one fails, and the run completes: the next run redoes everything
+        first = SyncJournal(self.path)
+        for code in ('1', '2', '3'):
+            first.planned(f'service:{code}:aa')
+            if code != '2':
+                first.done(f'service:{code}:aa')
+        first.complete()
+
+        second = SyncJournal(self.path)
+        self.assertFalse(any(second.is_done(f'service:{code}:aa') for code in ('1', '2', '3')))
+        second.close()
+
+    def test_content_keyed_operations_are_not_skipped_after_a_change(self):
+        journal = SyncJournal(self.path)
+        journal.planned('service:1:aa')
+        journal.done('service:1:aa')
+        journal.close()
+
+        resumed = SyncJournal(self.path)
+        self.assertTrue(resumed.is_done('service:1:aa'))
+        self.assertFalse(resumed.is_done('service:1:bb'))
+        resumed.close()
+
+    def test_old_run_expires(self):
+        journal = SyncJournal(self.path, max_age=3600)
+        journal.done('report:740')
+        journal.close()
+
+        with mock.patch('pyJournal.time.time', return_value=time.time() + 7200):
+            expired = SyncJournal(self.path, max_age=3600)
+        self.assertFalse(expired.resumed)
+        self.assertEqual(expired.expired, journal.run_id)
+        self.assertFalse(expired.is_done('report:740'))
+        expired.close()
+
+    def test_run_from_another_window_expires(self):
+        journal = SyncJournal(self.path, window='2026-10-18 00:00:00')
+        journal.done('service:1:aa')
+        journal.close()
+
+        same = SyncJournal(self.path, window='2026-10-18 00:00:00')
+        self.assertTrue(same.resumed)
+        same.close()
+        other = SyncJournal(self.path, window='2026-10-19 00:00:00')
+        self.assertFalse(other.resumed)
+        self.assertEqual(other.expired, journal.run_id)
+        other.close()
+
+    def test_journal_without_start_time(self):
+        with open(self.path, 'w', encoding='utf-8') as journal_file:
+            journal_file.write(json.dumps({'event': 'start', 'run_id': 'old'}) + '\n')
+            journal_file.write(json.dumps({'event': 'done', 'op': 'report:740'}) + '\n')
+
+        without_limit = SyncJournal(self.path)
+        self.assertTrue(without_limit.resumed)
+        without_limit.close()
+        with_limit = SyncJournal(self.path, max_age=3600)
+        self.assertEqual(with_limit.expired, 'old')
+        with_limit.close()
+
+    def test_truncated_last_line_is_ignored(self):
+        journal = SyncJournal(self.path)
+        journal.done('service:1:aa')
+        journal.close()
+        with open(self.path, 'a', encoding='utf-8') as journal_file:
+            journal_file.write('{"event": "done", "op": "serv')
+
+        resumed = SyncJournal(self.path)
+        self.assertTrue(resumed.is_done('service:1:aa'))
+        self.assertEqual(len(resumed._done), 1)
+        resumed.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+-------------------------------------------------------------------------------
+Name:           test_pyRecords.py
+
+Date:           19/10/2026
+
+Last Update:    19/10/2026
+
+Purpose:        Checks the record decoding and the id-keyed 'AssetIndex',
+                including assets that share a name.
+
+Author:         Morteza Zeinali
+-------------------------------------------------------------------------------
+Usage:
+        python -m unittest discover tests
+-------------------------------------------------------------------------------
+"""
+
+# Import required Python modules
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyRecords import Asset, AssetIndex, Finding, Report
+
+
+def asset(asset_id, name):
+    return Asset(id=asset_id, name=name, type='static', tags='SVC', defined_ips='')
+
+
+class RecordsTest(unittest.TestCase):
+
+    def test_from_json(self):
+        record = Asset.from_json({'id': 12, 'name': 'SVC1', 'type': 'static', 'tags': None})
+        self.assertEqual((record.id, record.name, record.tags, record.defined_ips), ('12', 'SVC1', '', ''))
+
+        report = Report.from_json({'id': 5, 'name': 'SVC1', 'type': 'pdf', 'status': 'Completed',
+                                   'finishTime': '1700000000'})
+        self.assertEqual((report.id, report.finish_time), ('5', 1700000000))
+
+        finding = Finding.from_json({'pluginID': '19506', 'pluginName': 'Scan Info', 'ip': '10.0.0.1',
+                                     'port': '0', 'protocol': 'TCP', 'severity': {'id': '4', 'name': 'Critical'},
+                                     'firstSeen': '100', 'lastSeen': '200'}, asset_id=12)
+        self.assertEqual((finding.asset_id, finding.plugin_id, finding.severity, finding.last_seen),
+                         ('12', 19506, 4, 200))
+
+
+class AssetIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = AssetIndex([asset('1', 'SVC1'), asset('2', 'SVC2'), asset('3', 'SVC1')])
+
+    def test_find_returns_every_asset_with_the_name(self):
+        self.assertEqual([found.id for found in self.index.find('SVC1')], ['1', '3'])
+        self.assertEqual(self.index.find('missing'), [])
+        self.assertIn('SVC2', self.index)
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(sorted(self.index.names()), ['SVC1', 'SVC2'])
+
+    def test_remove_by_id(self):
+        self.assertEqual(self.index.remove('1').id, '1')
+        self.assertEqual([found.id for found in self.index.find('SVC1')], ['3'])
+        self.assertIsNone(self.index.remove('1'))
+        self.index.remove('3')
+        self.assertNotIn('SVC1', self.index)
+        self.assertEqual(self.index.names(), ['SVC2'])
+
+    def test_add_replaces_the_same_id(self):
+        self.index.add(asset('2', 'SVC2-renamed'))
+        self.assertEqual(len(self.index), 3)
+        self.assertNotIn('SVC2', self.index)
+        self.assertEqual(self.index.find('SVC2-renamed')[0].id, '2')
+
+    def test_iteration_allows_removal(self):
+        for indexed in self.index:
+            self.index.remove(indexed.id)
+        self.assertEqual(len(self.index), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
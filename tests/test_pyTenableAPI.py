@@ -0,0 +1,111 @@
+"""
+-------------------------------------------------------------------------------
+Name:           test_pyTenableAPI.py
+
+Date:           19/10/2026
+
+Last Update:    19/10/2026
+
+Purpose:        Checks the 'ResponseCache' of the Tenable.sc client: the TTL,
+                the least-recently-used eviction by size, and the
+                invalidation of a resource and its related resources.
+
+Author:         Morteza Zeinali
+-------------------------------------------------------------------------------
+Usage:
+        python -m unittest discover tests
+
+   Skipped when 'requests' is not installed.
+-------------------------------------------------------------------------------
+"""
+
+# Import required Python modules
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from pyTenableAPI import ResponseCache
+except ImportError:
+    ResponseCache = None
+
+
+def response(size: int):
+    return SimpleNamespace(content=b'x' * size)
+
+
+@unittest.skipIf(ResponseCache is None, "'requests' is not installed")
+class ResponseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = 1000.0
+        patcher = mock.patch('pyTenableAPI.time.monotonic', side_effect=lambda: self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_entries_expire_after_the_ttl(self):
+        cache = ResponseCache(ttl=30)
+        key = cache.make_key('asset', {'fields': 'id,name'})
+        cached = response(10)
+        cache.put(key, cached)
+        self.clock += 29
+        self.assertIs(cache.get(key), cached)
+        self.clock += 2
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(cache._bytes, 0)
+
+    def test_keys_ignore_parameter_order(self):
+        self.assertEqual(ResponseCache.make_key('asset', {'a': 1, 'b': 2}),
+                         ResponseCache.make_key('asset', {'b': 2, 'a': 1}))
+        self.assertNotEqual(ResponseCache.make_key('asset'), ResponseCache.make_key('asset', {}))
+
+    def test_least_recently_used_is_evicted_first(self):
+        cache = ResponseCache(max_bytes=30)
+        for name in ('a', 'b', 'c'):
+            cache.put(cache.make_key(name), response(10))
+        cache.get(cache.make_key('a'))
+        cache.put(cache.make_key('d'), response(10))
+        self.assertIsNone(cache.get(cache.make_key('b')))
+        for name in ('a', 'c', 'd'):
+            self.assertIsNotNone(cache.get(cache.make_key(name)))
+        self.assertEqual(cache._bytes, 30)
+
+    def test_replacing_and_oversized_entries(self):
+        cache = ResponseCache(max_bytes=30)
+        key = cache.make_key('asset')
+        cache.put(key, response(10))
+        cache.put(key, response(20))
+        self.assertEqual(cache._bytes, 20)
+        cache.put(cache.make_key('report'), response(31))
+        self.assertIsNone(cache.get(cache.make_key('report')))
+        self.assertEqual(cache._bytes, 20)
+
+    def test_invalidate_drops_the_resource_and_related_resources(self):
+        cache = ResponseCache()
+        for endpoint in ('asset', 'asset/12?fields=id', 'report', 'reportDefinition', 'repository'):
+            cache.put(cache.make_key(endpoint), response(10))
+        cache.invalidate('asset/12')
+        self.assertIsNone(cache.get(cache.make_key('asset')))
+        self.assertIsNone(cache.get(cache.make_key('asset/12?fields=id')))
+        self.assertIsNotNone(cache.get(cache.make_key('report')))
+
+        cache.invalidate('reportDefinition/7/launch')
+        self.assertIsNone(cache.get(cache.make_key('report')))
+        self.assertIsNone(cache.get(cache.make_key('reportDefinition')))
+        self.assertIsNotNone(cache.get(cache.make_key('repository')))
+
+        cache.clear()
+        self.assertIsNone(cache.get(cache.make_key('repository')))
+        self.assertEqual(cache._bytes, 0)
+
+    def test_resource(self):
+        self.assertEqual(ResponseCache.resource('asset/12?fields=id'), 'asset')
+        self.assertEqual(ResponseCache.resource('report?filter=usable'), 'report')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+"""
+-------------------------------------------------------------------------------
+Name:           test_pyVulnStore.py
+
+Date:           19/10/2026
+
+Last Update:    19/10/2026
+
+Purpose:        Checks the SQLite findings store: storing and reading
+                findings, the incremental and full refresh windows, the
+                purge, the summaries, and 'export_vulns' against a fake
+                Tenable.sc client.
+
+Author:         Morteza Zeinali
+-------------------------------------------------------------------------------
+Usage:
+        python -m unittest discover tests
+-------------------------------------------------------------------------------
+"""
+
+# Import required Python modules
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from configparser import ConfigParser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyRecords import Finding
+from pyVulnStore import VulnStore, export_vulns, store_path
+
+DAY = 86400
+NOW = 1_800_000_000
+
+
+def finding(asset_id, plugin_id, severity=2, last_seen=NOW, first_seen=None):
+    return Finding(asset_id=str(asset_id), plugin_id=plugin_id, plugin_name=f'Plugin {plugin_id}', ip='10.0.0.1',
+                   port=443, protocol='TCP', severity=severity, severity_name='', first_seen=first_seen or last_seen,
+                   last_seen=last_seen)
+
+
+class FakeTenablesc:
+    """Serves 'QueryVulnsPage' from a list of findings per asset; assets in 'broken' fail after their first page."""
+
+    def __init__(self, findings: dict, broken=()):
+        self.findings = findings
+        self.broken = set(broken)
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def QueryVulnsPage(self, query, asset_id):
+        start, end = int(query['query']['startOffset']), int(query['query']['endOffset'])
+        with self._lock:
+            self.queries.append((asset_id, query['query']['filters'][0]['value'], start))
+        if start and asset_id in self.broken:
+            raise RuntimeError('analysis request failed')
+        rows = self.findings.get(asset_id, [])
+        return rows[start:end], len(rows)
+
+
+class VulnStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, 'vulns.db')
+        self.store = VulnStore(self.path, window_days=30, full_refresh_days=7)
+
+    def tearDown(self):
+        self.store.close()
+        self.folder.cleanup()
+
+    def test_add_read_and_purge(self):
+        self.store.add([finding(1, 100, severity=1), finding(1, 101, severity=4, last_seen=NOW - 40 * DAY),
+                        finding(2, 100, severity=3)])
+        # The same key replaces the stored finding
+        self.store.add([finding(1, 100, severity=2)])
+        self.assertEqual(len(self.store.findings()), 3)
+        self.assertEqual(self.store.max_severity('1'), 4)
+        self.assertEqual(self.store.max_severity('1', since=NOW - 30 * DAY), 2)
+        self.assertEqual(self.store.max_severity('3'), 0)
+        self.assertEqual([found.plugin_id for found in self.store.findings('2')], [100])
+
+        self.assertEqual(self.store.purge(NOW), 1)
+        self.assertEqual(self.store.max_severity('1'), 2)
+
+    def test_refresh_days(self):
+        self.assertEqual(self.store.refresh_days('1', NOW), 30)
+        self.store.mark_refreshed(['1'], NOW - 2 * DAY, full_ids={'1'})
+        self.assertEqual(self.store.refresh_days('1', NOW), 3)
+        self.store.mark_refreshed(['1'], NOW - 60)
+        self.assertEqual(self.store.refresh_days('1', NOW), 2)
+        # The full export of two days ago is kept by the incremental one
+        self.assertEqual(self.store.refresh_days('1', NOW + 5 * DAY - 60), 6)
+        self.assertEqual(self.store.refresh_days('1', NOW + 5 * DAY), 30)
+
+    def test_full_refresh_drops_findings_not_returned(self):
+        self.store.add([finding(1, 100), finding(1, 101), finding(2, 100)], exported_at=NOW - DAY)
+        self.store.add([finding(1, 100), finding(2, 100)], exported_at=NOW)
+        self.store.mark_refreshed(['1'], NOW)
+        self.assertEqual(len(self.store.findings('1')), 2)
+        self.store.mark_refreshed(['1', '2'], NOW, full_ids={'1'})
+        self.assertEqual([found.plugin_id for found in self.store.findings('1')], [100])
+        self.assertEqual(len(self.store.findings('2')), 1)
+
+    def test_iter_rows(self):
+        self.store.add([finding(asset_id, 100 + asset_id) for asset_id in range(5)])
+        batches = list(self.store.iter_rows(('asset_id', 'severity'), batch=2, as_integers=True))
+        self.assertEqual([len(rows) for rows in batches], [2, 2, 1])
+        self.assertEqual(sorted(row for rows in batches for row in rows), [(i, 2) for i in range(5)])
+        self.assertIsInstance(next(self.store.iter_rows(('asset_id',)))[0][0], str)
+        with self.assertRaises(ValueError):
+            list(self.store.iter_rows(('asset_id', 'exported_at')))
+
+    def test_summaries(self):
+        self.store.save_summaries({'Svc1': {'findings': 3}}, computed_at=NOW)
+        self.assertEqual(self.store.summary('SVC1'), {'findings': 3})
+        self.assertIsNone(self.store.summary('SVC2'))
+
+    def test_network_share_is_refused(self):
+        for path in ('\\\\server\\share\\vulns.db', '//server/share/vulns.db'):
+            with self.subTest(path=path), self.assertRaises(ValueError):
+                VulnStore(path)
+
+    def test_old_schema_is_migrated(self):
+        path = os.path.join(self.folder.name, 'old.db')
+        with sqlite3.connect(path) as db:
+            db.executescript("""
+                CREATE TABLE findings (asset_id TEXT NOT NULL, plugin_id INTEGER NOT NULL,
+                    plugin_name TEXT NOT NULL, ip TEXT NOT NULL, port INTEGER NOT NULL, protocol TEXT NOT NULL,
+                    severity INTEGER NOT NULL, severity_name TEXT NOT NULL, first_seen INTEGER NOT NULL,
+                    last_seen INTEGER NOT NULL, PRIMARY KEY (asset_id, plugin_id, ip, port, protocol)) WITHOUT ROWID;
+                CREATE TABLE refreshes (asset_id TEXT PRIMARY KEY, refreshed_at INTEGER NOT NULL);
+                INSERT INTO refreshes VALUES ('1', 1799990000);
+            """)
+        db.close()
+        store = VulnStore(path)
+        try:
+            store.add([finding(1, 100)], exported_at=NOW)
+            self.assertEqual(len(store.findings('1')), 1)
+            # The old refresh has no full export, so the next one is full
+            self.assertEqual(store.refresh_days('1', NOW), 30)
+        finally:
+            store.close()
+
+    def test_store_path(self):
+        config = ConfigParser()
+        config.read_string('[VulnStore]\npath = data/vulns.db\n')
+        self.assertEqual(store_path(config, '/opt/scripts'), os.path.join('/opt/scripts', 'data/vulns.db'))
+        self.assertEqual(store_path(config, '/opt/scripts', 'emea'), os.path.join('/opt/scripts', 'data/vulns.emea.db'))
+        self.assertIsNone(store_path(ConfigParser(), '/opt/scripts'))
+
+
+class ExportVulnsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.store = VulnStore(os.path.join(self.folder.name, 'vulns.db'))
+        self.now = int(time.time())
+
+    def tearDown(self):
+        self.store.close()
+        self.folder.cleanup()
+
+    def test_pages_are_stored_and_failed_assets_not_refreshed(self):
+        sc = FakeTenablesc({'1': [finding(1, plugin, last_seen=self.now) for plugin in range(25)],
+                            '2': [finding(2, plugin, last_seen=self.now) for plugin in range(25)],
+                            '3': []}, broken={'2'})
+        result = export_vulns(sc, self.store, ['1', '2', '3'], page_size=10, max_workers=3, batch_rows=7)
+
+        self.assertEqual(result['failed'], ['2'])
+        self.assertEqual(result['assets'], 2)
+        self.assertEqual(result['full'], 2)
+        self.assertEqual(len(self.store.findings('1')), 25)
+        self.assertEqual(sorted(start for asset_id, _, start in sc.queries if asset_id == '1'), [0, 10, 20])
+        self.assertEqual(self.store.refresh_days('1', self.now), 1)
+        self.assertEqual(self.store.refresh_days('3', self.now), 1)
+        self.assertEqual(self.store.refresh_days('2', self.now), 30)
+
+        # The next export of the refreshed assets is incremental, the failed one is full again
+        sc.queries.clear()
+        sc.broken.clear()
+        result = export_vulns(sc, self.store, ['1', '2'], page_size=10)
+        self.assertEqual(result['full'], 1)
+        windows = {asset_id: window for asset_id, window, start in sc.queries if start == 0}
+        self.assertEqual(windows, {'1': '00:1', '2': '00:30'})
+        self.assertEqual(len(self.store.findings('2')), 25)
+
+
+if __name__ == '__main__':
+    unittest.main()
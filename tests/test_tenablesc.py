@@ -0,0 +1,108 @@
+"""
+-------------------------------------------------------------------------------
+Name:           test_tenablesc.py
+
+Date:           19/10/2026
+
+Last Update:    19/10/2026
+
+Purpose:        Runs every 'python tenablesc.py ...' example of the
+                'tenablesc.py' docstring, and checks the arguments after a
+                script subcommand reach the script unchanged, while '-h' and
+                unknown options never start it.
+
+Author:         Morteza Zeinali
+-------------------------------------------------------------------------------
+Usage:
+        python -m unittest discover tests
+
+   The scripts, the config check and the import report are replaced by
+   mocks, so no console or 'config.conf' is needed.
+-------------------------------------------------------------------------------
+"""
+
+# Import required Python modules
+import os
+import re
+import shlex
+import sys
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tenablesc
+
+
+def documented_examples() -> list:
+    """Returns the arguments of each 'python tenablesc.py ...' line of the module docstring."""
+    return [shlex.split(line) for line in re.findall(r'python tenablesc\.py (.+)', tenablesc.__doc__)]
+
+
+class TenablescTest(unittest.TestCase):
+
+    def run_main(self, argv: list) -> tuple:
+        """Runs tenablesc.main with the subcommands mocked; returns (exit status, mocks)."""
+        mocks = {'run_command': mock.Mock(), 'check_config': mock.Mock(return_value=[]),
+                 'import_report': mock.Mock()}
+        with mock.patch.multiple(tenablesc, **mocks), redirect_stdout(StringIO()):
+            status = tenablesc.main(argv)
+        return status, mocks
+
+    def test_documented_examples(self):
+        examples = documented_examples()
+        self.assertGreaterEqual(len(examples), 5)
+        for argv in examples:
+            with self.subTest(argv=argv):
+                status, mocks = self.run_main(argv)
+                self.assertEqual(status, 0)
+                command, args = argv[0], argv[1:]
+                if command in tenablesc.COMMANDS:
+                    mocks['run_command'].assert_called_once_with(command, args)
+                elif command == 'check':
+                    mocks['check_config'].assert_called_once_with(args or list(tenablesc.COMMANDS))
+                else:
+                    mocks['import_report'].assert_called_once_with(args or list(tenablesc.COMMANDS))
+
+    def test_script_options_are_forwarded(self):
+        for argv in (['sync', '--profile'], ['sync', '--shards', '8', '--profile'], ['create-reports'],
+                     ['download-reports', '--console', 'emea'], ['combine-assets', '--console=emea', '--profile']):
+            with self.subTest(argv=argv):
+                _, mocks = self.run_main(argv)
+                mocks['run_command'].assert_called_once_with(argv[0], argv[1:])
+
+    def test_script_help_does_not_run(self):
+        for command in tenablesc.COMMANDS:
+            for flag in ('-h', '--help'):
+                with self.subTest(command=command, flag=flag), redirect_stdout(StringIO()) as output:
+                    with mock.patch.object(tenablesc, 'run_command') as run_command, self.assertRaises(SystemExit) as exited:
+                        tenablesc.main([command, '--profile', flag])
+                    self.assertEqual(exited.exception.code, 0)
+                    self.assertIn('--console', output.getvalue())
+                    run_command.assert_not_called()
+
+    def test_script_rejects_unknown_options(self):
+        for argv in (['create-reports', '--shards', '8'], ['sync', '--shards'], ['sync', '--shards', 'eight'],
+                     ['download-reports', '--console'], ['combine-assets', 'check'], ['sync', '--dry-run']):
+            with self.subTest(argv=argv), mock.patch('sys.stderr', StringIO()):
+                with mock.patch.object(tenablesc, 'run_command') as run_command, self.assertRaises(SystemExit) as exited:
+                    tenablesc.main(argv)
+                self.assertEqual(exited.exception.code, 2)
+                run_command.assert_not_called()
+
+    def test_check_problems_exit_status(self):
+        with mock.patch.object(tenablesc, 'check_config', return_value=['Missing sc_host in [Tenable.sc]']), \
+                redirect_stdout(StringIO()):
+            self.assertEqual(tenablesc.main(['check', 'sync']), 1)
+
+    def test_unknown_subcommand(self):
+        with mock.patch('sys.stderr', StringIO()):
+            for argv in (['upload'], ['check', 'upload'], []):
+                with self.subTest(argv=argv), self.assertRaises(SystemExit):
+                    tenablesc.main(argv)
+
+
+if __name__ == '__main__':
+    unittest.main()